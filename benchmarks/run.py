@@ -0,0 +1,177 @@
+"""
+Times every stage of the optimizer on synthetic slates and saves the results as JSON.
+
+	python -m benchmarks.run --games 2 6 12 --lineups 10 50 --output bench_results.json
+	python -m benchmarks.run --games 3 --lineups 40 --overlap 3 --sites draftkings --check-pruning --check-cache
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import pulp
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import write_slate
+from nhl.backtest import SITES
+from nhl.cache import ResultCache
+from nhl.lineups import Lineups
+from nhl.slate import SKATERS_SCHEMA, GOALIES_SCHEMA, read_slate_csv
+from nhl.metrics import MemoryCollector
+
+def timed(function, *args, **kwargs):
+	"""
+	Returns the result of the call and the time it took in seconds.
+	"""
+	start = time.perf_counter()
+	result = function(*args, **kwargs)
+	return result, time.perf_counter() - start
+
+def run_case(site, players_filepath, goalies_filepath, output_filepath, num_lineups, overlap, solver):
+	"""
+	Runs one site on one slate and returns the time of every stage.
+	The stages mirror run_example.py: load_inputs, create_indicators, model build, solve, fill_lineups and save_file.
+	"""
+	metrics = MemoryCollector()
+	optimizer = SITES[site](num_lineups=num_lineups, overlap=overlap, solver=solver,
+							players_filepath=players_filepath, goalies_filepath=goalies_filepath,
+							output_filepath=output_filepath, metrics=metrics)
+	optimizer.create_indicators()
+	lineups = optimizer.generate_lineups(formula=optimizer.type_1, progress=False)
+	filled_lineups, fill_time = timed(optimizer.fill_lineups, lineups)
+	optimizer.save_file(optimizer.header, filled_lineups)
+	optimizer.save_file(optimizer.header, filled_lineups, show_proj=True)
+	solves = [record['solve'] for record in metrics.events('lineup')]
+	return {
+		'num_skaters': optimizer.num_skaters,
+		'num_goalies': optimizer.num_goalies,
+		'lineups_produced': len(lineups),
+		'load_inputs': metrics.total('load_inputs', 'seconds'),
+		'create_indicators': metrics.total('create_indicators', 'seconds'),
+		'build_model': metrics.total('build_model', 'seconds'),
+		'add_cuts': metrics.total('lineup', 'build'),
+		'solve_total': sum(solves),
+		'solve_mean': float(np.mean(solves)) if solves else None,
+		'solve_max': max(solves) if solves else None,
+		'extract': metrics.total('lineup', 'extract'),
+		'fill_lineups': fill_time,
+		'save_file': metrics.total('save_file', 'seconds'),
+	}
+
+def check_pruning(site, players_filepath, goalies_filepath, num_lineups, overlap, solver):
+	"""
+	Generates the lineups with and without prune_players and returns how much the model shrank and the solve times.
+	Every pruned lineup is confirmed against the model over every player with the same prior lineups: pruned_optimal is
+		False if any of them is worse than the best lineup over every player. The sequences can still part ways where
+		the solver breaks a tie differently (pruned_identical).
+	"""
+	optimizers, lineups, seconds = {}, {}, {}
+	for pruned in (False, True):
+		optimizer = SITES[site](num_lineups=num_lineups, overlap=overlap, solver=solver, players_filepath=players_filepath,
+								goalies_filepath=goalies_filepath, output_filepath=None)
+		optimizer.create_indicators()
+		if pruned:
+			size = optimizer.prune_players()
+		lineups[pruned], seconds[pruned] = timed(optimizer.generate_lineups, formula=optimizer.type_1, progress=False)
+		optimizers[pruned] = optimizer
+	projections = {pruned: optimizers[pruned].fill_lineups(lineups[pruned])['PROJ'].values for pruned in lineups}
+
+	#the best lineup over every player after each prefix of the pruned lineups
+	full = optimizers[False]
+	full.model = full.build_type_1(pruned=False)
+	full.lazy_cuts = False
+	prefix = Lineups(lineups[True].num_players, lineups[True].roster_size)
+	best = []
+	for lineup in lineups[True]:
+		full.solve_model(prefix)
+		best.append(pulp.value(full.model.prob.objective))
+		prefix.append(lineup)
+	return {'pruned_size': size, 'unpruned_seconds': seconds[False], 'pruned_seconds': seconds[True],
+			'pruned_optimal': bool(np.all(projections[True] >= np.array(best) - 1e-6)),
+			'pruned_identical': bool(len(projections[False]) == len(projections[True]) and np.allclose(projections[False], projections[True]))}
+
+def check_cache(site, players_filepath, goalies_filepath, num_lineups, overlap, solver):
+	"""
+	Generates the lineups through a ResultCache, lowers the projection of a player who first shows up in the middle
+		lineup and generates them again. Every lineup before that one is still optimal, so the second run has to reuse
+		at least that many (cache_reused and cache_expected).
+	"""
+	with tempfile.TemporaryDirectory() as directory:
+		cache = ResultCache(directory)
+		skaters, goalies = read_slate_csv(players_filepath, SKATERS_SCHEMA), read_slate_csv(goalies_filepath, GOALIES_SCHEMA)
+		reused = []
+		for run in range(2):
+			metrics = MemoryCollector()
+			optimizer = SITES[site](num_lineups=num_lineups, overlap=overlap, solver=solver, players_filepath=skaters,
+									goalies_filepath=goalies, output_filepath=None, metrics=metrics)
+			optimizer.create_indicators()
+			lineups = optimizer.generate_lineups(formula=optimizer.type_1, progress=False, cache=cache)
+			reused.append(metrics.events('cache')[0]['reused'])
+			if run == 0:
+				#the first skater that isn't in any lineup before the middle one
+				expected = len(lineups)//2
+				seen = np.zeros(optimizer.num_skaters + optimizer.num_goalies, dtype=bool)
+				for number, lineup in enumerate(lineups):
+					fresh = [k for k in lineup if k < optimizer.num_skaters and not seen[k]]
+					if number >= expected and fresh:
+						break
+					seen[lineup] = True
+				expected = number
+				skaters = skaters.copy()
+				skaters.loc[fresh[0], 'proj'] -= 0.5
+	return {'cache_reused': reused[1], 'cache_expected': expected}
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Benchmark the NHL optimizer stages on synthetic slates.')
+	parser.add_argument('--games', type=int, nargs='+', default=[2, 6, 10, 15], help='slate sizes in games (2 to 15)')
+	parser.add_argument('--lineups', type=int, nargs='+', default=[10, 50], help='lineup counts')
+	parser.add_argument('--sites', nargs='+', default=sorted(SITES), choices=sorted(SITES))
+	parser.add_argument('--overlap', type=int, default=4)
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--solver', default='PULP_CBC_CMD', help='name of the pulp solver class')
+	parser.add_argument('--output', default='bench_results.json')
+	parser.add_argument('--check-pruning', action='store_true', help='also check every lineup of prune_players against the full model')
+	parser.add_argument('--check-cache', action='store_true', help='also check that the result cache reuses a partial prefix')
+	args = parser.parse_args(argv)
+
+	solver = getattr(pulp, args.solver)(msg=0)
+	results = []
+	with tempfile.TemporaryDirectory() as directory:
+		for games in args.games:
+			players_filepath, goalies_filepath = write_slate(directory, games, args.seed)
+			for site in args.sites:
+				for num_lineups in args.lineups:
+					output_filepath = os.path.join(directory, '{}_{}g_{}.csv'.format(site, games, num_lineups))
+					result = dict(site=site, games=games, num_lineups=num_lineups, overlap=args.overlap, seed=args.seed)
+					result.update(run_case(site, players_filepath, goalies_filepath, output_filepath, num_lineups, args.overlap, solver))
+					if args.check_pruning:
+						result.update(check_pruning(site, players_filepath, goalies_filepath, num_lineups, args.overlap, solver))
+					if args.check_cache:
+						result.update(check_cache(site, players_filepath, goalies_filepath, num_lineups, args.overlap, solver))
+					results.append(result)
+					print('{site} {games} games {num_lineups} lineups: build {build_model:.3f}s solve {solve_total:.3f}s'.format(**result))
+					if not result.get('pruned_optimal', True):
+						print('PRUNING LOST PROJECTED POINTS: {site} {games} games {num_lineups} lineups'.format(**result))
+					if result.get('cache_reused', 0) < result.get('cache_expected', 0):
+						print('CACHE REUSED {cache_reused} OF {cache_expected} LINEUPS: {site} {games} games {num_lineups} lineups'.format(**result))
+
+	report = {
+		'python': platform.python_version(),
+		'pulp': pulp.__version__ if hasattr(pulp, '__version__') else None,
+		'pandas': pd.__version__,
+		'numpy': np.__version__,
+		'solver': args.solver,
+		'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+		'results': results,
+	}
+	with open(args.output, 'w') as f:
+		json.dump(report, f, indent=2)
+	print('Saved benchmark results to: {}'.format(args.output))
+	failed = [result for result in results if not result.get('pruned_optimal', True) or
+				result.get('cache_reused', 0) < result.get('cache_expected', 0)]
+	return 1 if failed else 0
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
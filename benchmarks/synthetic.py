@@ -0,0 +1,59 @@
+import os
+import numpy as np
+import pandas as pd
+
+TEAMS = ['ANA', 'ARI', 'BOS', 'BUF', 'CAR', 'CBJ', 'CGY', 'CHI', 'COL', 'DAL', 'DET', 'EDM', 'FLA', 'LAK', 'MIN', 'MTL',
+			'NJD', 'NSH', 'NYI', 'NYR', 'OTT', 'PHI', 'PIT', 'SJS', 'STL', 'TBL', 'TOR', 'VAN', 'VGK', 'WPG', 'WSH']
+#forward lines 1-3 (C, LW, RW) and defense pairs 5-7, like the example inputs
+SKATER_SLOTS = [(pos, line) for line in (1, 2, 3) for pos in ('C', 'LW', 'RW')] + [('D', line) for line in (5, 5, 6, 6, 7, 7)]
+#mean salary by line, projections are roughly linear in salary above a floor (fit on the example inputs)
+LINE_SALARY = {1: 6800, 2: 5000, 3: 3500, 5: 5200, 6: 4100, 7: 3200}
+SKATER_PROJ = (2300, 1000.)
+GOALIE_PROJ = (4000, 750.)
+
+def generate_slate(num_games, seed=0, depth=0.85):
+	"""
+	Returns a synthetic (skaters_df, goalies_df) slate with num_games games (2 to 15).
+	Every team gets 3 forward lines, 3 defense pairs and a starting goalie. Each skater makes the slate with probability depth,
+		the top two lines make up the power play units and the projections and actuals follow the salaries.
+	"""
+	if not 2 <= num_games <= len(TEAMS)//2:
+		raise ValueError('num_games must be between 2 and {}'.format(len(TEAMS)//2))
+	random = np.random.RandomState(seed)
+	teams = random.choice(TEAMS, 2*num_games, replace=False)
+	opponents = teams.reshape(-1, 2)[:, ::-1].ravel()
+
+	skaters = pd.DataFrame([(team, opp, pos, line) for team, opp in zip(teams, opponents) for pos, line in SKATER_SLOTS],
+							columns=['team', 'opp', 'pos', 'line'])
+	skaters = skaters[random.uniform(size=len(skaters.index)) < depth].reset_index(drop=True)
+	num_skaters = len(skaters.index)
+	salary = skaters['line'].map(LINE_SALARY).values*random.lognormal(0, 0.15, num_skaters)
+	skaters['sal'] = np.clip(np.round(salary, -2), 2900, 9000).astype(int)
+	skaters['ppLine'] = np.where(skaters['line'].isin((1, 5)), 1, np.where(skaters['line'].isin((2, 6)), 2, 0))
+	skaters['proj'] = np.round(np.maximum((skaters['sal'] - SKATER_PROJ[0])/SKATER_PROJ[1]*random.lognormal(0, 0.25, num_skaters), 0.2), 2)
+	skaters['actual'] = np.round(np.maximum(skaters['proj'] + random.normal(0, 1.5, num_skaters), 0)*2)/2
+	skaters['playerName'] = ['Skater {}'.format(i+1) for i in range(num_skaters)]
+
+	goalies = pd.DataFrame({'team': teams, 'opp': opponents})
+	goalies['sal'] = np.clip(np.round(random.normal(7800, 450, len(teams)), -2), 6800, 9000).astype(int)
+	goalies['proj'] = np.round((goalies['sal'] - GOALIE_PROJ[0])/GOALIE_PROJ[1]*random.lognormal(0, 0.15, len(teams)), 2)
+	goalies['actual'] = np.round(goalies['proj'] + random.normal(0, 3, len(teams)), 1)
+	goalies['playerName'] = ['Goalie {}'.format(i+1) for i in range(len(teams))]
+
+	skaters = skaters[['playerName', 'sal', 'pos', 'team', 'opp', 'line', 'ppLine', 'proj', 'actual']]
+	goalies = goalies[['playerName', 'sal', 'team', 'opp', 'proj', 'actual']]
+	return skaters, goalies
+
+def write_slate(directory, num_games, seed=0, slate_id=None):
+	"""
+	Writes a synthetic slate as players_inputs/player_<id>.csv and goalies_inputs/goalie_<id>.csv under directory
+		and returns the two filepaths.
+	"""
+	slate_id = slate_id or '{}g_{}'.format(num_games, seed)
+	skaters, goalies = generate_slate(num_games, seed)
+	players_filepath = os.path.join(directory, 'players_inputs', 'player_{}.csv'.format(slate_id))
+	goalies_filepath = os.path.join(directory, 'goalies_inputs', 'goalie_{}.csv'.format(slate_id))
+	for filepath, data in ((players_filepath, skaters), (goalies_filepath, goalies)):
+		os.makedirs(os.path.dirname(filepath), exist_ok=True)
+		data.to_csv(filepath, index=False)
+	return players_filepath, goalies_filepath
@@ -0,0 +1,86 @@
+import os
+import re
+import time
+import itertools
+import pulp
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from nhl.fanduel import Fanduel
+from nhl.draftkings import Draftkings
+
+SITES = {'draftkings': Draftkings, 'fanduel': Fanduel}
+PERCENTILES = (25, 50, 75, 90, 99)
+
+def find_slates(directory):
+	"""
+	Returns the matching skater and goalie inputs under directory keyed by slate id,
+		i.e. {'17791': ('.../player_17791.csv', '.../goalie_17791.csv')}.
+	"""
+	players, goalies = {}, {}
+	for root, _, files in os.walk(directory):
+		for name in files:
+			match = re.match(r'(player|goalie)_(.+)\.csv$', name)
+			if match:
+				found = players if match.group(1) == 'player' else goalies
+				found[match.group(2)] = os.path.join(root, name)
+	return {slate: (players[slate], goalies[slate]) for slate in sorted(players) if slate in goalies}
+
+def parameter_grid(grid):
+	"""
+	Expands a grid such as {'site': ['draftkings', 'fanduel'], 'overlap': [4, 5], 'num_lineups': [150]}
+		into the list of every parameter combination.
+	"""
+	keys = sorted(grid)
+	return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+def run_slate(slate, players_filepath, goalies_filepath, params, solver):
+	"""
+	Runs the optimizer on one slate for every parameter combination and scores the lineups against the actuals.
+	Returns one summary row per parameter combination.
+	"""
+	rows = []
+	for param in params:
+		start = time.time()
+		optimizer = SITES[param['site']](num_lineups=param['num_lineups'],
+										overlap=param['overlap'],
+										solver=solver,
+										players_filepath=players_filepath,
+										goalies_filepath=goalies_filepath,
+										output_filepath=None)
+		if not optimizer.actuals:
+			raise ValueError('NO ACTUAL COLUMN FOR SLATE: {}'.format(slate))
+		optimizer.create_indicators()
+		lineups = optimizer.generate_lineups(formula=optimizer.type_1, progress=False)
+		scores = optimizer.actual_scores(lineups)
+		row = dict(slate=slate, **param)
+		row['lineups'] = len(lineups)
+		row['max'] = scores.max() if len(scores) else np.nan
+		row['mean'] = scores.mean() if len(scores) else np.nan
+		for percentile, value in zip(PERCENTILES, np.percentile(scores, PERCENTILES) if len(scores) else [np.nan]*len(PERCENTILES)):
+			row['p{}'.format(percentile)] = value
+		row['runtime'] = time.time() - start
+		rows.append(row)
+	return rows
+
+def backtest(directory, grid, output_filepath, solver=None, workers=None):
+	"""
+	Backtests every slate found in directory over the parameter grid.
+	The slates are spread across worker processes and the summary table (per slate max, mean, percentiles and runtime
+		of the lineups' actual points) is saved to output_filepath and returned.
+	"""
+	solver = solver or pulp.PULP_CBC_CMD(msg=0)
+	slates = find_slates(directory)
+	params = parameter_grid(grid)
+	rows = []
+	with ProcessPoolExecutor(workers) as executor:
+		futures = [executor.submit(run_slate, slate, players, goalies, params, solver) for slate, (players, goalies) in slates.items()]
+		for future in tqdm(as_completed(futures), total=len(futures)):
+			rows.extend(future.result())
+	summary = pd.DataFrame(rows, columns=['slate'] + sorted(grid) + ['lineups', 'max', 'mean'] +
+							['p{}'.format(percentile) for percentile in PERCENTILES] + ['runtime'])
+	summary = summary.sort_values(['slate'] + sorted(grid)).reset_index(drop=True)
+	summary.to_csv(output_filepath, index=False)
+	print("Saved backtest summary to: {}".format(output_filepath))
+	return summary
@@ -0,0 +1,188 @@
+"""
+Runs a manifest of slates x sites x parameters without any prompts.
+
+	python -m nhl.batch manifest.json --workers 8 --report batch_report.csv
+
+The manifest is a JSON file such as
+	{
+		"slates": "nhl/example_inputs",
+		"sites": ["draftkings", "fanduel"],
+		"params": {"num_lineups": [150], "overlap": [4, 5]},
+		"solver": "PULP_CBC_CMD",
+		"output_directory": "batch_output",
+		"slate_cache": "slate_cache"
+	}
+where slates is either a directory searched for player_<id>.csv/goalie_<id>.csv pairs or a list of
+	{"slate": id, "players": filepath, "goalies": filepath}. The num_lineups and overlap params go to the optimizer and
+	any other params (e.g. lazy_cuts, seed) go to generate_lineups. The solver is a pulp solver class name or a solver
+	portfolio such as {"portfolio": ["PULP_CBC_CMD", "GLPK_CMD"], "time_limit": 10, "gap": 0.001} (see SolverPortfolio). The optional slate_cache is a directory where the
+	parsed slates are cached in binary form for the next runs.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import traceback
+from collections import OrderedDict
+import pulp
+import pandas as pd
+from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from nhl.backtest import SITES, find_slates, parameter_grid
+from nhl.metrics import MemoryCollector
+from nhl.portfolio import BACKENDS, SolverPortfolio
+from nhl.writer import LineupWriter
+from nhl.slate import SKATERS_SCHEMA, GOALIES_SCHEMA, read_slate_csv
+
+OPTIMIZER_PARAMS = ('num_lineups', 'overlap')
+REPORT_COLUMNS = ['job', 'slate', 'site', 'params', 'status', 'lineups', 'load', 'create_indicators', 'build_model',
+					'solve', 'save_file', 'runtime', 'solvers', 'output', 'error']
+
+#slates loaded by this process (at most MAX_SLATES) shared by every job on the slate
+slates = OrderedDict()
+MAX_SLATES = 4
+
+def load_slate(players_filepath, goalies_filepath, slate_cache=None):
+	"""
+	Returns the (skaters, goalies) dataframes of a slate and how long the loading took (0 if it was already loaded).
+	"""
+	key = (players_filepath, goalies_filepath)
+	if key in slates:
+		slates.move_to_end(key)
+		return slates[key], 0.
+	start = time.perf_counter()
+	slates[key] = (read_slate_csv(players_filepath, SKATERS_SCHEMA, slate_cache), read_slate_csv(goalies_filepath, GOALIES_SCHEMA, slate_cache))
+	while len(slates) > MAX_SLATES:
+		slates.popitem(last=False)
+	return slates[key], time.perf_counter() - start
+
+def read_manifest(filepath):
+	"""
+	Returns the jobs of a manifest (one per slate, site and parameter combination) ordered by slate, plus the solver
+		and the manifest's settings.
+	"""
+	with open(filepath) as f:
+		manifest = json.load(f)
+	found = manifest['slates']
+	if isinstance(found, str):
+		found = [{'slate': slate, 'players': players, 'goalies': goalies} for slate, (players, goalies) in find_slates(found).items()]
+	sites = manifest.get('sites', sorted(SITES))
+	unknown = [site for site in sites if site not in SITES]
+	if unknown:
+		raise ValueError('UNKNOWN SITES IN MANIFEST: {}'.format(', '.join(unknown)))
+	params = parameter_grid(manifest.get('params', {}))
+	jobs = []
+	for slate in found:
+		for site in sites:
+			for param in params:
+				jobs.append({'job': len(jobs) + 1, 'slate': str(slate['slate']), 'players': slate['players'],
+							'goalies': slate['goalies'], 'site': site, 'params': param})
+	solver = manifest.get('solver', 'PULP_CBC_CMD')
+	if isinstance(solver, dict):
+		solver = SolverPortfolio(solver.get('portfolio', BACKENDS), solver.get('time_limit'), solver.get('gap'))
+	else:
+		solver = getattr(pulp, solver)(msg=0)
+	settings = {'output_directory': manifest.get('output_directory', 'batch_output'), 'slate_cache': manifest.get('slate_cache')}
+	return jobs, solver, settings
+
+def output_filepath(output_directory, job):
+	"""
+	Returns the upload filepath of a job, e.g. batch_output/17791/draftkings_num_lineups-150_overlap-4.csv
+		(the projections are saved next to it with the _proj.csv suffix).
+	"""
+	name = '_'.join([job['site']] + ['{}-{}'.format(key, value) for key, value in sorted(job['params'].items())])
+	return os.path.join(output_directory, job['slate'], name + '.csv')
+
+def run_job(job, solver, settings):
+	"""
+	Runs one job in a worker process and streams its lineups to its output files.
+	Returns the job's report row - a failure is reported in the row instead of being raised so the batch carries on.
+	"""
+	start = time.perf_counter()
+	row = {'job': job['job'], 'slate': job['slate'], 'site': job['site'], 'params': json.dumps(job['params'], sort_keys=True)}
+	try:
+		(skaters, goalies), row['load'] = load_slate(job['players'], job['goalies'], settings['slate_cache'])
+		row['output'] = output_filepath(settings['output_directory'], job)
+		os.makedirs(os.path.dirname(row['output']), exist_ok=True)
+		metrics = MemoryCollector()
+		options = {key: value for key, value in job['params'].items() if key not in OPTIMIZER_PARAMS}
+		optimizer = SITES[job['site']](num_lineups=job['params'].get('num_lineups', 150),
+										overlap=job['params'].get('overlap', 4),
+										solver=solver,
+										players_filepath=skaters,
+										goalies_filepath=goalies,
+										output_filepath=row['output'],
+										metrics=metrics)
+		optimizer.create_indicators()
+		with LineupWriter(optimizer) as writer:
+			lineups = optimizer.generate_lineups(formula=optimizer.type_1, progress=False, writer=writer, **options)
+		row['status'] = 'ok'
+		row['lineups'] = len(lineups)
+		row['create_indicators'] = metrics.total('create_indicators', 'seconds')
+		row['build_model'] = metrics.total('build_model', 'seconds')
+		row['solve'] = metrics.total('lineup', 'solve')
+		#the backend that solved each lineup, e.g. PULP_CBC_CMD:140 GLPK_CMD:10
+		solvers = [record['solver'] for record in metrics.events('lineup')]
+		row['solvers'] = ' '.join('{}:{}'.format(name, solvers.count(name)) for name in sorted(set(solvers), key=str))
+		row['save_file'] = metrics.total('save_file', 'seconds')
+	#load_inputs exits on invalid filepaths
+	except (Exception, SystemExit) as error:
+		row['status'] = 'failed'
+		row['error'] = '{}: {}'.format(type(error).__name__, error)
+		traceback.print_exc()
+	row['runtime'] = time.perf_counter() - start
+	return row
+
+def run_jobs(jobs, solver, settings):
+	"""
+	Runs the jobs of one slate and parameter set (one per site) one after the other in a worker process, so the sites
+		share the slate's dataframes. Returns their report rows.
+	"""
+	return [run_job(job, solver, settings) for job in jobs]
+
+def group_jobs(jobs):
+	"""
+	Returns the jobs grouped by slate and parameters - the site jobs of each group run as one task.
+	"""
+	groups = OrderedDict()
+	for job in jobs:
+		groups.setdefault((job['slate'], json.dumps(job['params'], sort_keys=True)), []).append(job)
+	return list(groups.values())
+
+def run_batch(manifest_filepath, report_filepath, workers=None):
+	"""
+	Runs every job of the manifest over at most workers processes, with the site jobs of a slate and parameter set
+		in the same process (see run_jobs).
+	The rows of each finished task are appended to the report (CSV) as soon as it's done and the report is returned as a dataframe.
+	"""
+	jobs, solver, settings = read_manifest(manifest_filepath)
+	rows = []
+	with open(report_filepath, 'w') as f, ProcessPoolExecutor(workers) as executor, tqdm(total=len(jobs)) as progress_bar:
+		writer = csv.DictWriter(f, REPORT_COLUMNS)
+		writer.writeheader()
+		futures = [executor.submit(run_jobs, group, solver, settings) for group in group_jobs(jobs)]
+		for future in as_completed(futures):
+			task_rows = future.result()
+			for row in task_rows:
+				writer.writerow(row)
+				rows.append(row)
+			f.flush()
+			progress_bar.update(len(task_rows))
+	report = pd.DataFrame(rows, columns=REPORT_COLUMNS).sort_values('job').reset_index(drop=True)
+	failed = report[report['status'] == 'failed']
+	print("Ran {} jobs ({} failed), saved the report to: {}".format(len(report.index), len(failed.index), report_filepath))
+	return report
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Run the NHL optimizer over a manifest of slates, sites and parameters.')
+	parser.add_argument('manifest', help='JSON manifest of the slates, sites and parameters')
+	parser.add_argument('--workers', type=int, default=None, help='maximum number of concurrent jobs (default: number of cores)')
+	parser.add_argument('--report', default='batch_report.csv', help='CSV with the status and timings of every job')
+	args = parser.parse_args(argv)
+	report = run_batch(args.manifest, args.report, args.workers)
+	return 1 if (report['status'] == 'failed').any() else 0
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,112 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from nhl.lineups import Lineups
+
+class ResultCache:
+	"""
+	Disk backed cache of generated lineups with LRU eviction (at most max_entries files are kept in directory).
+	Entries are keyed by a hash of the slate inputs (without the projections and actuals), the site and its rules,
+		the formula, the solver settings and the overlap, and they store the projections the lineups were generated with.
+	When the projections are identical the cached lineups are returned as is. When some projections changed the longest
+		prefix of the cached lineups that is provably still optimal is kept and only the rest is re-solved.
+	The cache doesn't know how far the other lineups were from each cached one, so a prefix only survives changes that
+		can't help any other lineup catch up: lower projections for players outside of it, or raises that every lineup
+		of the prefix gets in full. Any raise for a player outside the first lineup re-solves every lineup, so when the
+		projections move both ways only identical reruns hit the cache.
+	"""
+	def __init__(self, directory, max_entries=64):
+		self.directory = directory
+		self.max_entries = max_entries
+		os.makedirs(directory, exist_ok=True)
+
+	def key(self, optimizer, formula):
+		"""
+		Returns the content address of a run (everything that decides the lineups except the projections, including the
+			pruned player pool since the pool depends on the projections).
+		"""
+		digest = hashlib.sha256()
+		for data in (optimizer.skaters_df, optimizer.goalies_df):
+			data = data.drop(columns=[column for column in ('proj', 'actual') if column in data])
+			digest.update(repr(list(data.columns)).encode())
+			digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+		rules = [optimizer.salary_cap, optimizer.header, optimizer.roster_skaters, optimizer.roster_goalies,
+					sorted(optimizer.position_limits.items()), optimizer.min_teams, optimizer.max_players_team,
+					optimizer.goalies_count_team, optimizer.line_stacks]
+		solver = None
+		if optimizer.solver is not None:
+			#a SolverPortfolio only exposes the settings that decide its solutions
+			settings = optimizer.solver.settings() if hasattr(optimizer.solver, 'settings') else vars(optimizer.solver)
+			solver = sorted((name, repr(value)) for name, value in settings.items())
+		pool = optimizer.pool.tolist() if optimizer.pool is not None else None
+		digest.update(repr((type(optimizer).__name__, rules, formula.__name__, type(optimizer.solver).__name__, solver,
+							optimizer.overlap, pool)).encode())
+		return digest.hexdigest()
+
+	def filepath(self, key):
+		return os.path.join(self.directory, key + '.npz')
+
+	def load(self, key):
+		"""
+		Returns the cached entry (and marks it as recently used) or None.
+		"""
+		filepath = self.filepath(key)
+		if not os.path.exists(filepath):
+			return None
+		os.utime(filepath)
+		with np.load(filepath) as entry:
+			return {name: entry[name] for name in entry.files}
+
+	def save(self, key, proj, lineups, exhausted):
+		"""
+		Saves the entry and evicts the least recently used ones beyond max_entries.
+		"""
+		np.savez(self.filepath(key), proj=proj, lineups=lineups[:], exhausted=exhausted)
+		entries = sorted((os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.npz')),
+							key=os.path.getmtime)
+		for filepath in entries[:max(0, len(entries) - self.max_entries)]:
+			os.remove(filepath)
+
+	@staticmethod
+	def valid_prefix(optimizer, old_proj, new_proj, cached):
+		"""
+		Returns how many of the cached lineups are still optimal with the new projections.
+		A cached lineup was optimal for the old projections given the lineups before it, so it stays optimal if the change
+			in its own projection is at least the largest change any lineup could get
+			(the sum of the largest increases over the roster's skaters and goalies).
+		"""
+		change = new_proj - old_proj
+		skaters_change = np.sort(np.maximum(change[:optimizer.num_skaters], 0))[::-1]
+		goalies_change = np.sort(np.maximum(change[optimizer.num_skaters:], 0))[::-1]
+		bound = skaters_change[:optimizer.roster_skaters].sum() + goalies_change[:optimizer.roster_goalies].sum()
+		still_optimal = change[cached].sum(axis=1) >= bound - 1e-9
+		return len(cached) if still_optimal.all() else int(np.argmin(still_optimal))
+
+	def generate_lineups(self, optimizer, formula, incremental=True, lazy_cuts=False, active_cuts=100, progress=True, writer=None):
+		"""
+		Generate the optimizer's lineups, reusing the cached ones wherever they are still optimal.
+		The lineups are written to the writer (if any) as they're reused or produced.
+		"""
+		key = self.key(optimizer, formula)
+		proj = np.concatenate((optimizer.skaters_df['proj'].values, optimizer.goalies_df['proj'].values)).astype(float)
+		lineups = Lineups(optimizer.num_skaters + optimizer.num_goalies, optimizer.roster_skaters + optimizer.roster_goalies)
+		entry = self.load(key)
+		reused = 0
+		exhausted = False
+		if entry is not None:
+			cached = entry['lineups']
+			reused = min(self.valid_prefix(optimizer, entry['proj'], proj, cached), optimizer.num_lineups)
+			for lineup in cached[:reused]:
+				lineups.append(lineup)
+			#the cached run already produced every feasible lineup
+			exhausted = reused == len(cached) and bool(entry['exhausted'])
+		if len(lineups) < optimizer.num_lineups and not exhausted:
+			lineups = optimizer.generate_lineups_sequential(formula, incremental, lazy_cuts, active_cuts, progress, lineups, writer)
+		elif writer is not None:
+			writer.write(lineups[:])
+		if optimizer.metrics is not None:
+			optimizer.metrics.record('cache', key=key, reused=reused, lineups=len(lineups))
+		if entry is None or len(lineups) > reused or not np.array_equal(entry['proj'], proj):
+			self.save(key, proj, lineups, len(lineups) < optimizer.num_lineups)
+		return lineups
@@ -0,0 +1,63 @@
+import numpy as np
+
+#number of set bits in every possible byte, used to popcount the packed lineups
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+class Lineups:
+	"""
+	Compact storage for generated lineups.
+	Each lineup is a fixed size array of the selected player indices (skaters first, then goalies offset by the number of skaters)
+		along with a packed bitset over the player pool used for fast overlap and duplicate checks.
+	"""
+	def __init__(self, num_players, roster_size):
+		self.num_players = num_players
+		self.roster_size = roster_size
+		self.count = 0
+		self.indices = np.zeros((16, roster_size), dtype=np.int32)
+		self.bits = np.zeros((16, (num_players + 7) // 8), dtype=np.uint8)
+
+	def __len__(self):
+		return self.count
+
+	def __getitem__(self, key):
+		return self.indices[:self.count][key]
+
+	def __iter__(self):
+		return iter(self.indices[:self.count])
+
+	def __contains__(self, lineup):
+		return bool(self.count) and self.overlap(lineup).max() == self.roster_size
+
+	def pack(self, lineup):
+		"""
+		Returns the packed bitset for a lineup given as selected player indices.
+		"""
+		flags = np.zeros(self.num_players, dtype=np.uint8)
+		flags[lineup] = 1
+		return np.packbits(flags)
+
+	def append(self, lineup):
+		"""
+		Adds a lineup given as selected player indices (the indices are stored sorted).
+		"""
+		if self.count == len(self.indices):
+			self.indices = np.concatenate((self.indices, np.zeros_like(self.indices)))
+			self.bits = np.concatenate((self.bits, np.zeros_like(self.bits)))
+		self.indices[self.count] = np.sort(lineup)
+		self.bits[self.count] = self.pack(lineup)
+		self.count += 1
+
+	def remove(self, number):
+		"""
+		Removes lineup number (the lineups after it move up by one).
+		"""
+		self.indices[number:self.count-1] = self.indices[number+1:self.count]
+		self.bits[number:self.count-1] = self.bits[number+1:self.count]
+		self.count -= 1
+
+	def overlap(self, lineup):
+		"""
+		Returns the number of players the lineup shares with each stored lineup.
+		"""
+		shared = np.bitwise_and(self.bits[:self.count], self.pack(lineup))
+		return POPCOUNT[shared].sum(axis=1, dtype=np.int32)
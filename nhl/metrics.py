@@ -0,0 +1,73 @@
+import json
+import time
+
+class Metrics:
+	"""
+	Metrics Base Class
+	Collects the instrumentation events recorded by an Optimizer (pass it as metrics=...).
+	Every event is a flat dict with the event name, a timestamp and its fields - it's handed to emit and to every callback.
+	When no metrics object is set the optimizer still reads the clock around each stage but builds and records no events.
+	"""
+	def __init__(self, callbacks=None):
+		self.callbacks = list(callbacks or [])
+
+	def record(self, event, **fields):
+		record = {'event': event, 'timestamp': time.time()}
+		record.update(fields)
+		self.emit(record)
+		for callback in self.callbacks:
+			callback(record)
+
+	def emit(self, record):
+		pass
+
+	def close(self):
+		pass
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+class MemoryCollector(Metrics):
+	"""
+	Keeps the events in memory.
+	"""
+	def __init__(self, callbacks=None):
+		super().__init__(callbacks)
+		self.records = []
+
+	def emit(self, record):
+		self.records.append(record)
+
+	def events(self, event):
+		"""
+		Returns the recorded events with the given name.
+		"""
+		return [record for record in self.records if record['event'] == event]
+
+	def total(self, event, field):
+		"""
+		Returns the sum of a field over the recorded events with the given name.
+		"""
+		return sum(record[field] for record in self.events(event) if record.get(field) is not None)
+
+
+class JsonLinesCollector(Metrics):
+	"""
+	Writes every event as one JSON line to filepath.
+	"""
+	def __init__(self, filepath, callbacks=None):
+		super().__init__(callbacks)
+		self.filepath = filepath
+		self.file = open(filepath, 'a')
+
+	def emit(self, record):
+		self.file.write(json.dumps(record, default=float) + '\n')
+		self.file.flush()
+
+	def close(self):
+		if not self.file.closed:
+			self.file.close()
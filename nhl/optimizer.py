@@ -1,57 +1,98 @@
+import os
 import sys
 import csv
+import time
 import pulp
-import copy
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor
+from nhl.lineups import Lineups
+from nhl.simulator import Simulator
+from nhl.slate import SKATERS_SCHEMA, GOALIES_SCHEMA, read_slate_csv
 
 class Optimizer:
 	"""
 	Optimizer Base Class
 	"""
-	def __init__(self, num_lineups, overlap, solver, players_filepath, goalies_filepath, output_filepath):
+	def __init__(self, num_lineups, overlap, solver, players_filepath, goalies_filepath, output_filepath, metrics=None, slate_cache=None):
+		self.metrics = metrics
 		self.num_lineups = num_lineups
 		self.overlap = overlap
 		self.solver = solver
-		self.skaters_df = self.load_inputs(players_filepath)
-		self.goalies_df = self.load_inputs(goalies_filepath)
+		self.slate_cache = slate_cache
+		self.skaters_df = self.load_inputs(players_filepath, SKATERS_SCHEMA)
+		self.goalies_df = self.load_inputs(goalies_filepath, GOALIES_SCHEMA)
 		self.num_skaters = len(self.skaters_df.index)
 		self.num_goalies = len(self.goalies_df.index)
 		self.output_filepath = output_filepath
-		self.positions = {'C':[], 'W':[], 'D':[]}
-		self.team_lines = []
-		self.skaters_teams = []
-		self.goalies_teams = []
-		self.goalies_opponents = []
+		self.position_keys = ['C', 'W', 'D']
+		self.positions_matrix = None
+		self.team_lines_matrix = None
+		self.skaters_teams_matrix = None
+		self.goalies_teams_matrix = None
+		self.goalies_opponents_matrix = None
+		self.dense_views = {}
+		self.teams = None
 		self.num_teams = None
 		self.num_lines = None
+		self.pool = None
+		self.model = None
+		self.lazy_cuts = False
+		self.active_cuts = None
+		self.cuts_activated = 0
 		self.actuals = True if 'actual' in self.skaters_df and 'actual' in self.goalies_df else False
 
-	def load_inputs(self, filepath):
+	def __getstate__(self):
 		"""
-		Returns the loaded data from the user filepath into a pandas dataframe.
+		Drops the built model, the cached dense views and the metrics when the optimizer is sent to a worker process.
 		"""
+		state = self.__dict__.copy()
+		state['model'] = None
+		state['dense_views'] = {}
+		state['metrics'] = None
+		return state
+
+	def load_inputs(self, filepath, schema):
+		"""
+		Returns the loaded data from the user filepath into a pandas dataframe, typed and validated with the schema
+			(team, opp and pos are categorical). With slate_cache set the parsed data is cached there as binary columns.
+		A dataframe that is already loaded (e.g. one slate shared by the Draftkings and Fanduel optimizers) is used as is.
+		"""
+		if isinstance(filepath, pd.DataFrame):
+			return filepath
+		start = time.perf_counter()
 		try:
-			data = pd.read_csv(filepath)
+			data = read_slate_csv(filepath, schema, self.slate_cache)
 		except IOError:
 			sys.exit('INVALID FILEPATH: {}'.format(filepath))
+		if self.metrics is not None:
+			self.metrics.record('load_inputs', seconds=time.perf_counter() - start, filepath=filepath, rows=len(data.index))
 		return data
 
+	def simulate(self, seed=None, **settings):
+		"""
+		Returns a Simulator that draws correlated outcomes for the loaded skaters and goalies.
+		The settings (cv and the factor weights) are passed on to the Simulator.
+		"""
+		return Simulator(self.skaters_df, self.goalies_df, seed=seed, **settings)
+
 	def save_file(self, header, filled_lineups, show_proj=False):
 		"""
 		Save the filled lineups to CSV.
+		Compact lineups (as returned by generate_lineups) are filled first.
 		If show_proj is True the file will be saved with the projections
 			and possibly the actual fantasy points if they exist.
 		"""
 		#Remove the projections and actuals if they exist to get lineups ready to upload to DK or FD
-		header_copy = copy.deepcopy(header)
-		output_projection_path = self.output_filepath.split('.')[0] + '_proj.csv'
-		if self.actuals:
-			lineups_for_upload = [lineup[:-2] for lineup in filled_lineups]
-			header_copy.extend(('PROJ', 'ACTUAL'))
-		else:
-			lineups_for_upload = [lineup[:-1] for lineup in filled_lineups]
-			header_copy.extend(('PROJ'))
+		start = time.perf_counter()
+		if isinstance(filled_lineups, Lineups):
+			filled_lineups = self.fill_lineups(filled_lineups)
+		header_copy = list(header) + list(filled_lineups.columns[len(header):])
+		output_projection_path = self.projection_filepath()
+		filled_lineups = filled_lineups.values.tolist()
+		lineups_for_upload = [lineup[:len(header)] for lineup in filled_lineups]
 		#save the file for upload
 		if show_proj == False:
 			with open(self.output_filepath, 'w') as f:
@@ -65,63 +106,849 @@ class Optimizer:
 					writer.writerow(header_copy)
 					writer.writerows(filled_lineups)
 			print("Saved lineups with projection to: {}".format(output_projection_path))
+		if self.metrics is not None:
+			self.metrics.record('save_file', seconds=time.perf_counter() - start, show_proj=show_proj, lineups=len(filled_lineups))
+
+	def projection_filepath(self):
+		"""
+		Returns the filepath of the lineups with projections (output_filepath with a _proj.csv suffix).
+		"""
+		return self.output_filepath.split('.')[0] + '_proj.csv'
+
+	def fill_lineups(self, lineups):
+		"""
+		Takes in the lineups as the indices of the players used in each lineup and fills all of them at once.
+		Every player is given its first position out of C, W, D (or G for goalies) and the slots are assigned from
+			the site's header in player order - the first C goes to the first C slot and so on, with any skaters left
+			over going to the UTIL slots.
+		Returns a DataFrame with one column per header slot plus the projected points and the actual points (if provided).
+		"""
+		indices = lineups[:]
+		names = np.concatenate((self.skaters_df['playerName'].values, self.goalies_df['playerName'].values)).astype(object)
+		proj = np.concatenate((self.skaters_df['proj'].values, self.goalies_df['proj'].values))
+
+		#position code of every player: the first of C, W, D for skaters (-1 if none) and len(position_keys) for goalies
+		flags = self.positions_matrix.toarray()
+		skater_codes = np.where(flags.any(axis=1), flags.argmax(axis=1), -1)
+		codes = np.concatenate((skater_codes, np.full(self.num_goalies, len(self.position_keys))))[indices]
+		slot_labels = self.position_keys + ['G']
+		header = np.array(self.header)
+
+		slots = np.full(indices.shape, -1)
+		for code, label in enumerate(slot_labels):
+			slot_table = np.flatnonzero(header == label)
+			chosen = codes == code
+			rank = np.cumsum(chosen, axis=1) - 1
+			fits = chosen & (rank < len(slot_table))
+			slots[fits] = slot_table[rank[fits]]
+		#skaters that didn't fit in their position's slots go to the UTIL slots
+		slot_table = np.flatnonzero(header == 'UTIL')
+		left_over = (slots == -1) & (codes >= 0) & (codes < len(self.position_keys))
+		rank = np.cumsum(left_over, axis=1) - 1
+		fits = left_over & (rank < len(slot_table))
+		slots[fits] = slot_table[rank[fits]]
+
+		filled = np.full((len(indices), len(header)), "", dtype=object)
+		rows, cols = np.nonzero(slots >= 0)
+		filled[rows, slots[rows, cols]] = names[indices[rows, cols]]
+		filled_lineups = pd.DataFrame(filled, columns=self.header)
+		filled_lineups['PROJ'] = proj[indices].sum(axis=1).round(2)
+		if self.actuals:
+			filled_lineups['ACTUAL'] = self.actual_scores(lineups).round(2)
+		return filled_lineups
+
+	def actual_scores(self, lineups):
+		"""
+		Returns the actual fantasy points of every lineup (needs the actual column in both inputs).
+		"""
+		actual = np.concatenate((self.skaters_df['actual'].values, self.goalies_df['actual'].values))
+		return actual[lineups[:]].sum(axis=1)
 
 	def create_indicators(self):
 		"""
 		Preprocesses the data and classifies players into different indicators for constraints.
-		The indicators are saved as class variables.
+		The indicators are saved as class variables in scipy sparse (csc) incidence matrices built from categorical codes.
 		"""
-		teams = list(set(self.skaters_df['team'].values))
-		self.num_teams = len(teams)
+		start = time.perf_counter()
+		self.pool = None
+		self.teams = np.unique(self.skaters_df['team'].values.astype(str))
+		self.num_teams = len(self.teams)
+		self.dense_views = {}
+		skaters = np.arange(self.num_skaters)
+		goalies = np.arange(self.num_goalies)
+		skaters_team_codes = pd.Categorical(self.skaters_df['team'], categories=self.teams).codes
+		goalies_team_codes = pd.Categorical(self.goalies_df['team'], categories=self.teams).codes
 
 		#Create player position indicators so you know which position they are playing
-		for pos in self.skaters_df.loc[:, 'pos']:
-			for key in self.positions:
-				self.positions[key].append(1 if key in pos else 0)
-		
+		pos = self.skaters_df['pos'].astype(str)
+		position_flags = np.column_stack([pos.str.contains(key, regex=False).values for key in self.position_keys])
+		self.positions_matrix = sp.csc_matrix(position_flags.astype(np.int8))
+
 		#Create player line indicators so you know which line by their team they are on
-		for i, line in enumerate(self.skaters_df.loc[:, 'line']):
-			player_line = []
-			if int(line) == 1:
-				player_line.extend((1, 0, 0, 0))
-			elif int(line) == 2:
-				player_line.extend((0, 1, 0, 0))
-			elif int(line) == 3:
-				player_line.extend((0, 0, 1, 0))
-			elif int(line) == 4:
-				player_line.extend((0, 0, 0, 1))
-			else:
-				player_line.extend((0, 0, 0, 0))
-			player_lines = []
-			for team in teams:
-				if self.skaters_df.loc[i, 'team'] == team:
-					player_lines.extend(player_line)
-				else:
-					player_lines.extend((0, 0, 0, 0))
-			self.team_lines.append(player_lines)
-		self.num_lines = len(self.team_lines[0])
+		#(column team*4 + line-1, players outside lines 1-4 get no entry)
+		lines = self.skaters_df['line'].values.astype(int)
+		on_line = (lines >= 1) & (lines <= 4) & (skaters_team_codes >= 0)
+		self.num_lines = 4*self.num_teams
+		self.team_lines_matrix = self.incidence(skaters[on_line], skaters_team_codes[on_line]*4 + lines[on_line] - 1,
+												(self.num_skaters, self.num_lines))
 
 		#Create player team indicators so you know which team they are on (for use in DK team constraint)
-		for player_team in self.skaters_df.loc[:, 'team']:
-			self.skaters_teams.append([1 if player_team == team else 0 for team in teams])
+		on_team = skaters_team_codes >= 0
+		self.skaters_teams_matrix = self.incidence(skaters[on_team], skaters_team_codes[on_team], (self.num_skaters, self.num_teams))
 
 		#Create goalie team indicators so you know which team they are on (for use in FD team constraint)
-		for goalie_team in self.goalies_df.loc[:, 'team']:
-			self.goalies_teams.append([1 if goalie_team == team else 0 for team in teams])
+		on_team = goalies_team_codes >= 0
+		self.goalies_teams_matrix = self.incidence(goalies[on_team], goalies_team_codes[on_team], (self.num_goalies, self.num_teams))
 
 		#Create goalie opponent indicators so you know who the goalie is opposing
-		for player_opp in self.skaters_df.loc[:, 'opp']:
-			self.goalies_opponents.append([1 if player_opp == team else 0 for team in self.goalies_df.loc[:, 'team']])
+		#(skaters by opponent times goalies by team over every team name in the slate)
+		all_teams = np.unique(np.concatenate((self.skaters_df['opp'].values.astype(str), self.goalies_df['team'].values.astype(str))))
+		skaters_opp_codes = pd.Categorical(self.skaters_df['opp'].astype(str), categories=all_teams).codes
+		goalies_codes = pd.Categorical(self.goalies_df['team'].astype(str), categories=all_teams).codes
+		skaters_opps = self.incidence(skaters, skaters_opp_codes, (self.num_skaters, len(all_teams)))
+		goalies_on = self.incidence(goalies, goalies_codes, (self.num_goalies, len(all_teams)))
+		self.goalies_opponents_matrix = sp.csc_matrix(skaters_opps @ goalies_on.T)
+		if self.metrics is not None:
+			self.metrics.record('create_indicators', seconds=time.perf_counter() - start,
+								skaters=self.num_skaters, goalies=self.num_goalies, teams=self.num_teams)
+
+	def prune_players(self, slack=0):
+		"""
+		Removes the dominated players from the player pool the models are built over (run it after create_indicators).
+		Players are grouped by everything the constraints see - position, team, opponent and line (lines 1-4, the other
+			lines are one group) for skaters and team and opponent for goalies. A player is dominated by another player
+			of its group with a salary that isn't higher and a projection that isn't lower (ties go to the first player).
+		A player is only dropped when it has at least depth*num_lineups + slack dominating players, where depth is the most
+			players of its group a lineup can hold. Each of the (at most num_lineups-1) prior lineups holds at most depth of them
+			and the lineup itself at most depth-1 others, so a dominating player outside of all of them is always left. Swapping
+			it in keeps every constraint, doesn't lower the projection and can't raise the overlap with any prior lineup, so each
+			lineup over the pool is as good as the best lineup over every player (the lineups only differ between ties).
+			The rule only drops players from deep groups of interchangeable players - with many lineups it usually keeps
+			every player and only the empty rows below are left out. A higher slack keeps more players.
+		The models then leave out the line stacks that the pool can't fill and the team and goalie opponent rows without players.
+		self.pool keeps the original indices of the remaining players, so the lineups keep the original player indices
+			and fill_lineups is unchanged.
+		Returns (and prints) how much the model shrank.
+		"""
+		start = time.perf_counter()
+		skaters = self.skaters_df
+		lines = skaters['line'].values.astype(int)
+		skater_groups = pd.DataFrame({'pos': skaters['pos'].astype(str), 'team': skaters['team'].astype(str),
+									'opp': skaters['opp'].astype(str), 'line': np.where((lines >= 1) & (lines <= 4), lines, 0)})
+		skater_groups = skater_groups.groupby(['pos', 'team', 'opp', 'line']).ngroup().values
+		goalie_groups = self.goalies_df[['team', 'opp']].astype(str).groupby(['team', 'opp']).ngroup().values
+
+		#the most players of a group one lineup can hold, times the lineups that can block a dominating player
+		flags = self.positions_matrix.toarray().astype(bool)
+		highs = np.array([self.position_limits[key][1] for key in self.position_keys])
+		skater_depth = np.where(flags.any(axis=1), np.where(flags, highs, self.roster_skaters).min(axis=1), self.roster_skaters)
+		skater_depth = np.minimum(skater_depth, min(self.max_players_team, self.roster_skaters))
+		goalie_depth = np.full(self.num_goalies, self.roster_goalies)
+
+		num_lineups = max(self.num_lineups, 1)
+		keep_skaters = self.undominated(skater_groups, skaters['sal'].values, skaters['proj'].values, skater_depth*num_lineups + slack)
+		keep_goalies = self.undominated(goalie_groups, self.goalies_df['sal'].values, self.goalies_df['proj'].values,
+										goalie_depth*num_lineups + slack)
+		before = self.model_size()
+		self.pool = np.concatenate((np.flatnonzero(keep_skaters), self.num_skaters + np.flatnonzero(keep_goalies)))
+		after = self.model_size()
+		self.model = None
+		print('Pruned {} of {} skaters and {} of {} goalies, the model shrank from {} to {} variables and {} to {} constraints'.format(
+			self.num_skaters - keep_skaters.sum(), self.num_skaters, self.num_goalies - keep_goalies.sum(), self.num_goalies,
+			before['variables'], after['variables'], before['constraints'], after['constraints']), '\n')
+		if self.metrics is not None:
+			self.metrics.record('prune_players', seconds=time.perf_counter() - start, skaters=int(keep_skaters.sum()),
+								goalies=int(keep_goalies.sum()), before=before, after=after)
+		return {'before': before, 'after': after}
+
+	@staticmethod
+	def undominated(groups, sal, proj, depth):
+		"""
+		Returns which players have fewer than depth dominating players in their group.
+		"""
+		index = np.arange(len(groups))
+		#dominates[i, j] is True when player i dominates player j
+		dominates = ((groups[:, None] == groups[None, :]) & (sal[:, None] <= sal[None, :]) & (proj[:, None] >= proj[None, :]) &
+					((sal[:, None] < sal[None, :]) | (proj[:, None] > proj[None, :]) | (index[:, None] < index[None, :])))
+		return dominates.sum(axis=0) < depth
+
+	def model_columns(self, matrices, pruned):
+		"""
+		Returns the rows of the model (the columns of the coefficient matrices restricted to the pool) that are kept:
+			every team, line and goalie without pruning, otherwise only the teams with players, the lines with enough
+			players for each line stack size and the goalies in the pool with opposing skaters.
+		"""
+		if not pruned:
+			columns = {'team': np.arange(self.num_teams), 'opponent': np.arange(self.num_goalies)}
+			columns.update((size, np.arange(self.num_lines)) for size, _ in self.line_stacks)
+			return columns
+		line_players = matrices['line'].getnnz(axis=0)
+		goalies = self.pool[self.pool >= self.num_skaters] - self.num_skaters
+		columns = {'team': np.flatnonzero(matrices['team'].getnnz(axis=0)),
+					'opponent': goalies[matrices['opponent'][:, goalies].getnnz(axis=0) > 0]}
+		columns.update((size, np.flatnonzero(line_players >= size)) for size, _ in self.line_stacks)
+		return columns
+
+	def model_size(self):
+		"""
+		Returns the number of variables and constraints of the type 1 model over the current pool (before any overlap cuts).
+		"""
+		pruned = self.pool is not None
+		pool = self.pool if pruned else np.arange(self.num_skaters + self.num_goalies)
+		matrices = {name: matrix[pool] for name, matrix in self.coefficient_matrices().items()}
+		columns = self.model_columns(matrices, pruned)
+		positions = sum(1 if low == high else 2 for low, high in self.position_limits.values())
+		stacks = sum(len(columns[size]) for size, _ in self.line_stacks)
+		return {'variables': len(pool) + len(columns['team']) + stacks,
+				'constraints': 4 + positions + 2*len(columns['team']) + len(columns['opponent']) + stacks + len(self.line_stacks)}
+
+	@staticmethod
+	def incidence(rows, cols, shape):
+		"""
+		Returns a 0/1 sparse (csc) incidence matrix with a 1 at each (row, col) pair.
+		"""
+		data = np.ones(len(rows), dtype=np.int8)
+		return sp.csc_matrix((data, (rows, cols)), shape=shape)
+
+	def dense_view(self, name, matrix):
+		"""
+		Returns (and caches) the dense version of an indicator matrix.
+		"""
+		if matrix is None:
+			return []
+		if name not in self.dense_views:
+			self.dense_views[name] = matrix.toarray()
+		return self.dense_views[name]
+
+	@property
+	def positions(self):
+		"""
+		Dense view of the position indicators, keyed by position (kept for compatibility).
+		"""
+		if self.positions_matrix is None:
+			return {key: [] for key in self.position_keys}
+		dense = self.dense_view('positions', self.positions_matrix)
+		return {key: dense[:, j] for j, key in enumerate(self.position_keys)}
+
+	@property
+	def team_lines(self):
+		"""
+		Dense view of the team line indicators (kept for compatibility).
+		"""
+		return self.dense_view('team_lines', self.team_lines_matrix)
+
+	@property
+	def skaters_teams(self):
+		"""
+		Dense view of the skater team indicators (kept for compatibility).
+		"""
+		return self.dense_view('skaters_teams', self.skaters_teams_matrix)
+
+	@property
+	def goalies_teams(self):
+		"""
+		Dense view of the goalie team indicators (kept for compatibility).
+		"""
+		return self.dense_view('goalies_teams', self.goalies_teams_matrix)
+
+	@property
+	def goalies_opponents(self):
+		"""
+		Dense view of the goalie opponent indicators (kept for compatibility).
+		"""
+		return self.dense_view('goalies_opponents', self.goalies_opponents_matrix)
+
+	def coefficient_matrices(self):
+		"""
+		Returns the constraint coefficient matrices over all of the player variables (skaters then goalies).
+		Each column of a matrix is one row of the model.
+		"""
+		count = sp.csc_matrix(np.vstack((
+			np.column_stack((np.ones(self.num_skaters), np.zeros(self.num_skaters))),
+			np.column_stack((np.zeros(self.num_goalies), np.ones(self.num_goalies))))))
+		values = np.column_stack((
+			np.concatenate((self.skaters_df['sal'].values, self.goalies_df['sal'].values)),
+			np.concatenate((self.skaters_df['proj'].values, self.goalies_df['proj'].values))))
+		goalies_teams = self.goalies_teams_matrix if self.goalies_count_team else sp.csc_matrix(self.goalies_teams_matrix.shape)
+		return {
+			'count': count,
+			'value': sp.csc_matrix(values),
+			'position': sp.vstack((self.positions_matrix, sp.csc_matrix((self.num_goalies, len(self.position_keys))))),
+			'team': sp.vstack((self.skaters_teams_matrix, goalies_teams)),
+			'line': sp.vstack((self.team_lines_matrix, sp.csc_matrix((self.num_goalies, self.num_lines)))),
+			'opponent': sp.vstack((self.goalies_opponents_matrix, sp.csc_matrix((self.num_goalies, self.num_goalies)))),
+		}
+
+	@staticmethod
+	def compile_columns(matrix, variables):
+		"""
+		Returns one pulp expression per column of a coefficient matrix, built from only its nonzero entries.
+		"""
+		matrix = sp.csc_matrix(matrix)
+		matrix.eliminate_zeros()
+		indices, data = matrix.indices.tolist(), matrix.data.tolist()
+		expressions = []
+		for col in range(matrix.shape[1]):
+			start, end = matrix.indptr[col], matrix.indptr[col+1]
+			expressions.append(pulp.LpAffineExpression([(variables[k], coef) for k, coef in zip(indices[start:end], data[start:end])]))
+		return expressions
+
+	def build_type_1(self, pruned=True):
+		"""
+		Compiles the static part of the type 1 model (everything except the overlap cuts) once per slate.
+		The site rules (salary cap, roster and position counts, team limits, line stacks) are read from the subclass
+			and all of the constraints are added to the problem in one bulk call.
+		If pruned is True and prune_players was run the model only covers the players left in the pool.
+		"""
+		#define the pulp object problem
+		prob = pulp.LpProblem('NHL', pulp.LpMaximize)
+
+		#define the player and goalie variables over the pool
+		pruned = pruned and self.pool is not None
+		pool = self.pool if pruned else np.arange(self.num_skaters + self.num_goalies)
+		matrices = {name: matrix[pool] for name, matrix in self.coefficient_matrices().items()}
+		columns = self.model_columns(matrices, pruned)
+		skaters_lineup = [pulp.LpVariable("player_{}".format(k+1), cat="Binary") for k in pool[pool < self.num_skaters]]
+		goalies_lineup = [pulp.LpVariable("goalie_{}".format(k-self.num_skaters+1), cat="Binary") for k in pool[pool >= self.num_skaters]]
+		used_team = [pulp.LpVariable("u{}".format(i+1), cat="Binary") for i in columns['team']]
+		line_stacks = {size: [pulp.LpVariable("ls{}{}".format(size, i+1), cat="Binary") for i in columns[size]]
+						for size, _ in self.line_stacks}
+		variables = skaters_lineup + goalies_lineup
+		model = LineupModel(prob, skaters_lineup, goalies_lineup, pool)
+		expressions = {name: self.compile_columns(matrix, variables) for name, matrix in matrices.items()}
+		skaters, goalies = expressions['count']
+		salary, projection = expressions['value']
+
+		#add the max player constraints
+		constraints = [skaters == self.roster_skaters, goalies == self.roster_goalies]
+
+		#add the positional constraints
+		for key, position in zip(self.position_keys, expressions['position']):
+			low, high = self.position_limits[key]
+			if low == high:
+				constraints.append(position == low)
+			else:
+				constraints.extend((position >= low, position <= high))
+
+		#add the salary constraint
+		constraints.append(salary <= self.salary_cap)
+
+		#at least min_teams teams and no more than max_players_team players on the same team
+		for used, i in zip(used_team, columns['team']):
+			team = expressions['team'][i]
+			constraints.extend((team - used >= 0, team - self.max_players_team*used <= 0))
+		constraints.append(pulp.lpSum(used_team) >= self.min_teams)
+
+		#no goalies against skaters constraint
+		for i in columns['opponent']:
+			constraints.append(expressions['opponent'][i] + 6*model.lookup[self.num_skaters + i] <= 6)
+
+		#line stacks - at least num_lines lines with at least size players each
+		for size, num_lines in self.line_stacks:
+			for stack, i in zip(line_stacks[size], columns[size]):
+				constraints.append(expressions['line'][i] - size*stack >= 0)
+			constraints.append(pulp.lpSum(line_stacks[size]) >= num_lines)
+
+		prob.extend(constraints)
+
+		#add the objective
+		prob.setObjective(projection)
+
+		return model
+
+	def type_1(self, lineups):
+		"""
+		Sets up the pulp LP problem (once per slate), adds the overlap cuts and solves for the maximum value for each generated lineup.
+
+		Type 1 constraints include:
+			- 3-2 stacking (1 line of 3 players and one seperate line of 2 players)
+			- goalies stacking
+			- team stacking
+
+		Returns a single lineup as the sorted indices of the selected players (goalies are offset by the number of skaters).
+		"""
+		if self.model is None:
+			start = time.perf_counter()
+			self.model = self.build_type_1()
+			if self.metrics is not None:
+				self.metrics.record('build_model', seconds=time.perf_counter() - start, formula='type_1',
+									variables=len(self.model.prob.variables()), constraints=self.model.prob.numConstraints())
+		return self.solve_model(lineups)
 
-	def generate_lineups(self, formula):
+	def solve_model(self, lineups):
+		"""
+		Adds the overlap cuts for any lineups the model hasn't seen yet and re-solves it.
+		With lazy_cuts only the newest lineup's cut is added up front, the solution is checked against every prior lineup
+			and only the violated cuts are added before re-solving, so the overlap limit still holds exactly.
+			Once a lineup is accepted the least recently activated cuts are dropped from the model down to active_cuts.
+		Returns a single lineup as the indices of the selected players or None if no optimal solution was found.
+		With metrics set a 'lineup' event records the time spent adding cuts (build), solving and extracting the solution.
+		"""
+		timings = {'build': 0., 'solve': 0., 'extract': 0.}
+		solves = 0
+		if self.lazy_cuts:
+			new_cuts = [len(lineups)-1] if len(lineups) else []
+		else:
+			new_cuts = range(self.model.num_seen, len(lineups))
+		self.model.num_seen = len(lineups)
+		while True:
+			start = time.perf_counter()
+			for number in new_cuts:
+				self.model.add_overlap_cut(number, lineups[number], self.overlap)
+				self.cuts_activated += 1
+			timings['build'] += time.perf_counter() - start
+
+			#solve the problem
+			start = time.perf_counter()
+			status = self.model.solve(self.solver)
+			timings['solve'] += time.perf_counter() - start
+			solves += 1
+
+			#check if the optimizer found an optimal solution
+			if status != pulp.LpStatusOptimal:
+				self.record_lineup(len(lineups), status, timings, solves)
+				print('Only {} feasible lineups produced'.format(len(lineups)), '\n')
+				return None
+			start = time.perf_counter()
+			lineup = self.model.selected()
+			timings['extract'] += time.perf_counter() - start
+			if not self.lazy_cuts or not len(lineups):
+				self.record_lineup(len(lineups), status, timings, solves)
+				return lineup
+
+			#variance check against all of the previous lineups
+			new_cuts = np.flatnonzero(lineups.overlap(lineup) > self.overlap)
+			if not len(new_cuts):
+				while len(self.model.cuts) > self.active_cuts:
+					self.model.remove_overlap_cut(next(iter(self.model.cuts)))
+				self.record_lineup(len(lineups), status, timings, solves)
+				return lineup
+
+	def record_lineup(self, number, status, timings, solves):
+		"""
+		Records the 'lineup' event for lineup number (if metrics are set).
+		The solver is the pulp backend, or the backend that won the last race with a SolverPortfolio.
+		"""
+		if self.metrics is None:
+			return
+		solver = getattr(self.solver, 'winner', type(self.solver).__name__)
+		self.metrics.record('lineup', number=number, status=pulp.LpStatus[status], solves=solves, solver=solver,
+							objective=pulp.value(self.model.prob.objective) if status == pulp.LpStatusOptimal else None,
+							variables=len(self.model.prob.variables()), constraints=self.model.prob.numConstraints(), **timings)
+
+	def model_builder(self, formula):
+		"""
+		Returns the method that builds the static model of a formula (build_type_1 for type_1).
+		"""
+		return getattr(self, 'build_' + formula.__name__)
+
+	def generate_lineups(self, formula, incremental=True, lazy_cuts=False, active_cuts=100, workers=None, seed=None, progress=True, cache=None,
+							writer=None, tolerance=0.):
 		"""
 		Generate n lineups with the forumla's specified constraints.
+		If incremental is True the formula's model is built once and only the new overlap cut is added for each lineup,
+			otherwise the model is rebuilt from scratch for every lineup.
+		If lazy_cuts is True the overlap cuts are only added to the model once a solution violates them
+			and at most active_cuts of them are kept between lineups (useful for large lineup counts where most of the cuts are never binding).
+		If workers is set the lineups are produced in parallel (see generate_lineups_parallel and its tolerance).
+		Set progress to False to hide the progress bar.
+		If a ResultCache is passed the sequential lineups are reused from (and saved to) the cache.
+		If a LineupWriter is passed every lineup is written out as soon as it's produced.
+		"""
+		start = time.perf_counter()
+		if workers:
+			lineups = self.generate_lineups_parallel(formula, workers, seed, progress, writer, tolerance)
+		elif cache is not None:
+			lineups = cache.generate_lineups(self, formula, incremental, lazy_cuts, active_cuts, progress, writer)
+		else:
+			lineups = self.generate_lineups_sequential(formula, incremental, lazy_cuts, active_cuts, progress, writer=writer)
+		if self.metrics is not None:
+			self.metrics.record('generate_lineups', seconds=time.perf_counter() - start, lineups=len(lineups),
+								cuts_activated=self.cuts_activated, workers=workers)
+		return lineups
+
+	def generate_lineups_sequential(self, formula, incremental, lazy_cuts, active_cuts, progress, lineups=None, writer=None):
+		"""
+		Generate n lineups one at a time (see generate_lineups).
+		If lineups are passed the generation carries on from them.
 		"""
-		lineups = []
-		for _ in tqdm(range(self.num_lineups)):
+		if lineups is None:
+			lineups = Lineups(self.num_skaters + self.num_goalies, self.roster_skaters + self.roster_goalies)
+		if writer is not None:
+			writer.write(lineups[:])
+		self.model = None
+		self.lazy_cuts = lazy_cuts
+		self.active_cuts = active_cuts
+		self.cuts_activated = 0
+		for _ in tqdm(range(len(lineups), self.num_lineups), disable=not progress):
+			if not incremental:
+				self.model = None
 			lineup = formula(lineups)
-			if lineup:
+			if lineup is not None:
 				lineups.append(lineup)
+				if writer is not None:
+					writer.write(lineup)
 			else:
 				break
+		if lazy_cuts:
+			print('Activated {} overlap cuts for {} lineups'.format(self.cuts_activated, len(lineups)), '\n')
+		return lineups
+
+	def generate_lineups_parallel(self, formula, workers, seed=None, progress=True, writer=None, tolerance=0.):
+		"""
+		Generate n lineups with the formula's specified constraints over a pool of worker processes.
+		Every worker owns one model per goalie (the goalie's variable is fixed to 1) and the goalies are solved concurrently
+			against the lineups accepted so far (see solve_rounds).
+		With tolerance 0 the lineups are the same as the sequential ones up to ties. Each lineup still depends on the ones
+			before it, so the workers can only overlap the solves of different goalies and the look ahead solves, and the
+			rounds of solves level off at about half the lineups from 4 workers on. A tolerance (in projected points) also
+			accepts the lineups that are within it of the best one in the same round, which cuts the rounds much further:
+			every lineup is then within tolerance of the best lineup given the ones before it.
+		A seed adds a seeded jitter (under 1e-6 per player) to the projections so ties are broken the same way in every worker.
+		The lineups are deterministic for a seed, the number of workers and the tolerance.
+		"""
+		lineups = Lineups(self.num_skaters + self.num_goalies, self.roster_skaters + self.roster_goalies)
+		goalies = self.pool[self.pool >= self.num_skaters] if self.pool is not None else self.num_skaters + np.arange(self.num_goalies)
+		partitions = {int(k): ((int(k),), ()) for k in goalies}
+		builder = self.model_builder(formula).__name__
+		with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(self, builder, seed, True)) as executor, \
+				tqdm(total=self.num_lineups, disable=not progress) as progress_bar:
+			self.solve_rounds(executor, partitions, lineups, self.num_lineups, True, progress_bar, writer, workers=workers,
+								tolerance=tolerance)
+		if len(lineups) < self.num_lineups:
+			print('Only {} feasible lineups produced'.format(len(lineups)), '\n')
+		return lineups
+
+	def solve_rounds(self, executor, partitions, lineups, limit, repeat, progress_bar, writer=None, retired=None, workers=1,
+						tolerance=0.):
+		"""
+		Solves the partitions ({key: (indices fixed to 1, indices fixed to 0)}) on the executor's worker processes
+			and appends the accepted lineups to lineups until there are limit of them.
+		Every partition keeps its best lineup as a candidate. A candidate stays optimal for its partition as long as it
+			respects the overlap with the lineups accepted after it, otherwise its objective is only an upper bound on the
+			partition's next lineup. The best candidate (ties broken by key) is accepted as long as no partition without a
+			candidate could beat it by more than tolerance - with tolerance 0 it's the lineup a single model over every
+			partition would find next, so the lineups match the sequential ones up to ties. The candidates are accepted one
+			after the other until one of them is blocked, then the partitions without a candidate are solved concurrently
+			against the lineups accepted so far.
+		With repeat a partition keeps producing lineups, otherwise it is done once one of its lineups is accepted.
+			With repeat the workers left idle in a round look ahead: they solve the best candidates' partitions as if
+			the candidate was accepted, so the partition's next candidate is ready once it is (if it respects the overlap
+			with the lineups accepted in between).
+		The accepted lineups are written to the writer (if any) as they're accepted.
+		retired ({key: lineup}) are the lineups added to lineups in place of the partitions that become infeasible.
+			Every candidate and accepted lineup has to respect the overlap with them too, so the accepted lineups they rule out
+			are taken back out of lineups and their partitions are solved again.
+		With metrics set a 'partition' event records the round, the key and the wall and cpu time of every solve.
+		Returns the accepted (key, lineup) pairs in order and the keys of the partitions that became infeasible.
+		"""
+		accepted = {}
+		infeasible = []
+		candidates = {}
+		#upper bounds on the next lineup of the partitions whose candidate was ruled out
+		bounds = {}
+		#{key: (objective, lineup, number of lineups it was solved against before the key's candidate)}
+		ahead = {}
+		all_partitions = partitions
+		partitions = dict(partitions)
+		retired = retired or {}
+		order = lambda key, objective: (-round(objective, 6), key)
+		rounds = 0
+		while len(lineups) < limit and partitions:
+			#accept the best candidates until a partition without a candidate could beat one of them
+			while len(lineups) < limit and candidates:
+				key = min(candidates, key=lambda key: order(key, candidates[key][0]))
+				objective, lineup = candidates[key]
+				if any(order(other, bounds.get(other, np.inf) - tolerance) < order(key, objective)
+						for other in partitions if other not in candidates):
+					break
+				del candidates[key]
+				lineups.append(lineup)
+				accepted[key] = lineup
+				progress_bar.update()
+				if writer is not None:
+					writer.write(lineup)
+				if not repeat:
+					del partitions[key]
+				elif key in ahead:
+					next_objective, next_lineup, count = ahead.pop(key)
+					#infeasible with fewer cuts than it has now
+					if next_lineup is None:
+						infeasible.append(key)
+						del partitions[key]
+					elif (lineups.overlap(next_lineup)[count:] <= self.overlap).all():
+						candidates[key] = (next_objective, next_lineup)
+					else:
+						bounds[key] = next_objective
+				else:
+					bounds[key] = objective
+				#the candidates that break the overlap with the new lineup are solved again
+				for other in [other for other, (_, candidate) in candidates.items() if np.intersect1d(candidate, lineup).size > self.overlap]:
+					bounds[other] = candidates.pop(other)[0]
+					ahead.pop(other, None)
+			if len(lineups) >= limit or not partitions:
+				break
+
+			#solve the partitions without a candidate and look ahead on the best candidates with the idle workers
+			pending = [key for key in partitions if key not in candidates]
+			looked_ahead = []
+			if repeat:
+				looked_ahead = sorted((key for key in candidates if key not in ahead), key=lambda key: order(key, candidates[key][0]))
+				looked_ahead = looked_ahead[:max(workers - len(pending), 0)]
+			cuts = lineups[:].copy()
+			futures = [executor.submit(solve_partition, key, partitions[key], cuts, self.overlap) for key in pending]
+			futures += [executor.submit(solve_partition, key, partitions[key], np.vstack((cuts, candidates[key][1])), self.overlap)
+						for key in looked_ahead]
+			rounds += 1
+			for number, future in enumerate(futures):
+				key, lineup, objective, seconds, cpu = future.result()
+				if self.metrics is not None:
+					self.metrics.record('partition', round=rounds, key=key, ahead=number >= len(pending), seconds=seconds, cpu=cpu)
+				if number >= len(pending):
+					ahead[key] = (objective, lineup, len(cuts))
+				#partitions without a solution stay infeasible as cuts are only ever added
+				elif lineup is None:
+					infeasible.append(key)
+					del partitions[key]
+					bounds.pop(key, None)
+					if key in retired:
+						self.retire(retired[key], lineups, all_partitions, partitions, candidates, accepted, progress_bar)
+						#the lineups taken back out can raise the partitions' next lineups
+						bounds.clear()
+				else:
+					candidates[key] = (objective, lineup)
+					bounds.pop(key, None)
+		return list(accepted.items()), infeasible
+
+	def retire(self, lineup, lineups, all_partitions, partitions, candidates, accepted, progress_bar):
+		"""
+		Adds the lineup of a partition that became infeasible to lineups (see solve_rounds). The candidates and the
+			accepted lineups that break the overlap with it are dropped and their partitions are solved again.
+		"""
+		lineups.append(lineup)
+		for other in [other for other, (_, candidate) in candidates.items() if np.intersect1d(candidate, lineup).size > self.overlap]:
+			del candidates[other]
+		for other in [other for other, candidate in accepted.items() if np.intersect1d(candidate, lineup).size > self.overlap]:
+			number = int(np.flatnonzero(lineups.overlap(accepted[other]) == lineups.roster_size)[0])
+			lineups.remove(number)
+			del accepted[other]
+			partitions[other] = all_partitions[other]
+			progress_bar.update(-1)
+
+	def load_lineups(self, filepath):
+		"""
+		Returns the lineups saved by save_file (the upload file or the _proj.csv file) as compact Lineups,
+			matching the player names to the skaters and goalies.
+		"""
+		names = {name: i for i, name in enumerate(self.goalies_df['playerName'])}
+		names = {name: self.num_skaters + i for name, i in names.items()}
+		names.update((name, i) for i, name in enumerate(self.skaters_df['playerName']))
+		lineups = Lineups(self.num_skaters + self.num_goalies, self.roster_skaters + self.roster_goalies)
+		try:
+			with open(filepath) as f:
+				rows = list(csv.reader(f))[1:]
+		except IOError:
+			sys.exit('INVALID FILEPATH: {}'.format(filepath))
+		for row in rows:
+			missing = [name for name in row[:len(self.header)] if name not in names]
+			if missing:
+				raise ValueError('UNKNOWN PLAYERS IN {}: {}'.format(filepath, ', '.join(missing)))
+			lineups.append([names[name] for name in row[:len(self.header)]])
 		return lineups
+
+	def late_swap(self, lineups, removed=(), locked_teams=(), formula=None, workers=None, progress=True):
+		"""
+		Re-optimizes previously generated lineups (compact Lineups or the filepath of a file saved by save_file)
+			after players were removed (e.g. scratched) and the games of locked_teams started.
+		Only the lineups with a removed player whose game hasn't started are affected. Each of them keeps its players from
+			locked teams, can't add any other player from a locked team or a removed player and is re-solved under the
+			formula's rules and the overlap with every other lineup. The affected lineups are solved in parallel and
+			the unaffected ones are left untouched. The swaps are solved over the whole player pool (the locked players
+			may have been pruned).
+		Returns the lineups in their original order. Affected lineups without a feasible swap are kept as they were and
+			the swaps respect the overlap with them as well.
+		Raises a ValueError for removed players or locked teams that aren't on the slate.
+		"""
+		if not isinstance(lineups, Lineups):
+			lineups = self.load_lineups(lineups)
+		formula = formula or self.type_1
+		names = np.concatenate((self.skaters_df['playerName'].values, self.goalies_df['playerName'].values))
+		teams = np.concatenate((self.skaters_df['team'].values, self.goalies_df['team'].values))
+		unknown = [name for name in removed if not np.isin(name, names)]
+		if unknown:
+			raise ValueError('UNKNOWN PLAYERS: {}'.format(', '.join(unknown)))
+		unknown = [team for team in locked_teams if not np.isin(team, teams)]
+		if unknown:
+			raise ValueError('UNKNOWN TEAMS: {}'.format(', '.join(unknown)))
+		locked = np.isin(teams, list(locked_teams))
+		scratched = np.isin(names, list(removed)) & ~locked
+		affected = [number for number, lineup in enumerate(lineups) if scratched[lineup].any()]
+		if not affected:
+			return lineups
+
+		#the unaffected lineups go first so every swap respects the overlap with them
+		result = Lineups(lineups.num_players, lineups.roster_size)
+		for number, lineup in enumerate(lineups):
+			if number not in affected:
+				result.append(lineup)
+		partitions = {}
+		for number in affected:
+			lineup = lineups[number]
+			keep = tuple(int(k) for k in lineup[locked[lineup]])
+			exclude = tuple(int(k) for k in np.flatnonzero((locked | scratched) & ~np.isin(np.arange(len(names)), keep)))
+			partitions[number] = (keep, exclude)
+		builder = self.model_builder(formula).__name__
+		with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(self, builder, None, False)) as executor, \
+				tqdm(total=len(affected), disable=not progress) as progress_bar:
+			accepted, infeasible = self.solve_rounds(executor, partitions, result, len(lineups), False, progress_bar,
+													retired={number: lineups[number] for number in affected})
+		if infeasible:
+			print('No feasible swap for lineups: {}'.format(', '.join(str(number + 1) for number in sorted(infeasible))), '\n')
+
+		swapped = dict(accepted)
+		swapped_lineups = Lineups(lineups.num_players, lineups.roster_size)
+		for number, lineup in enumerate(lineups):
+			swapped_lineups.append(swapped.get(number, lineup))
+		return swapped_lineups
+
+	def generate_simulated_lineups(self, formula, num_sims, seed=None, **settings):
+		"""
+		Generate n lineups where each lineup maximizes the average of its own block of simulations
+			(num_sims are split into num_lineups blocks, so num_sims must be at least num_lineups) under the formula's
+			constraints and the overlap cuts.
+		The simulations are streamed block by block so memory stays bounded for large num_sims.
+		Returns the lineups and their simulated scores over all of the simulations as a (lineups x sims) float32 matrix.
+		"""
+		simulator = self.simulate(seed, **settings)
+		boundaries = simulator.boundaries(num_sims, self.num_lineups)
+		lineups = Lineups(self.num_skaters + self.num_goalies, self.roster_skaters + self.roster_goalies)
+		#the pool is pruned on the projections so the simulated objectives use every player
+		self.model = self.model_builder(formula)(pruned=False)
+		for draws in tqdm(simulator.blocks(boundaries), total=len(boundaries) - 1):
+			self.model.set_objective(draws.mean(axis=0))
+			lineup = self.solve_model(lineups)
+			if lineup is None:
+				break
+			lineups.append(lineup)
+		return lineups, simulator.score(lineups, boundaries)
+
+
+#state of a worker process for generate_lineups_parallel and late_swap
+worker = {}
+
+def init_worker(optimizer, builder, seed, pruned):
+	"""
+	Keeps the optimizer in the worker process, models are built lazily per partition (over the pruned pool if pruned).
+	"""
+	worker['optimizer'] = optimizer
+	worker['builder'] = builder
+	worker['seed'] = seed
+	worker['pruned'] = pruned
+	worker['models'] = {}
+	worker['cuts'] = {}
+
+def solve_partition(key, fixed, cuts, overlap):
+	"""
+	Solves the next lineup for one partition in a worker process. The partition's model is built on its first call
+		with the fixed ((indices fixed to 1), (indices fixed to 0)) variables. Its cuts are kept in step with the cuts passed in:
+		the ones it already has are kept up to the first lineup that differs, and the cuts from there on are replaced.
+	Returns the key, the lineup (or None if it is infeasible), the objective value and the wall and cpu time of the call.
+	"""
+	start = clock()
+	optimizer = worker['optimizer']
+	if key not in worker['models']:
+		model = getattr(optimizer, worker['builder'])(pruned=worker['pruned'])
+		if worker['seed'] is not None:
+			jitter = np.random.RandomState(worker['seed']).uniform(0, 1e-6, len(model.variables))
+			model.set_objective(model.objective_coefficients() + jitter)
+		ones, zeros = fixed
+		for k in ones:
+			model.lookup[k].lowBound = 1
+		for k in zeros:
+			if k in model.lookup:
+				model.lookup[k].upBound = 0
+		worker['models'][key] = model
+	model = worker['models'][key]
+	#the cuts are matched by content since lineups can be taken back out of the middle of the list (see solve_rounds)
+	seen = worker['cuts'].get(key, cuts[:0])
+	common = min(len(seen), len(cuts))
+	differs = np.flatnonzero((seen[:common] != cuts[:common]).any(axis=1))
+	common = int(differs[0]) if len(differs) else common
+	for number in range(common, len(seen)):
+		model.remove_overlap_cut(number)
+	for number in range(common, len(cuts)):
+		model.add_overlap_cut(number, cuts[number], overlap)
+	worker['cuts'][key] = cuts
+	model.num_seen = len(cuts)
+	if model.solve(optimizer.solver) != pulp.LpStatusOptimal:
+		return (key, None, None) + elapsed(start)
+	return (key, model.selected(), pulp.value(model.prob.objective)) + elapsed(start)
+
+def elapsed(start):
+	"""
+	Returns the wall and cpu time (of the worker and the solver subprocesses it waited on) since start = clock().
+	"""
+	wall, cpu = clock()
+	return wall - start[0], cpu - start[1]
+
+def clock():
+	times = os.times()
+	return time.perf_counter(), times.user + times.system + times.children_user + times.children_system
+
+
+class LineupModel:
+	"""
+	A built pulp problem along with its player variables.
+	The static constraints are built once per slate and the model is re-solved as overlap cuts are appended.
+	index holds the player index (skaters then goalies) of every variable when the model only covers part of the pool,
+		the lineups going in and out of the model always use the player indices.
+	"""
+	def __init__(self, prob, skaters_lineup, goalies_lineup, index=None):
+		self.prob = prob
+		self.skaters_lineup = skaters_lineup
+		self.goalies_lineup = goalies_lineup
+		self.variables = skaters_lineup + goalies_lineup
+		self.index = np.arange(len(self.variables)) if index is None else np.asarray(index)
+		self.lookup = dict(zip(self.index.tolist(), self.variables))
+		self.cuts = {}
+		self.num_seen = 0
+
+	def add_overlap_cut(self, number, lineup, overlap):
+		"""
+		Adds the variance constraint - the next lineup can't have more than the num overlap of the players in lineup number.
+		The lineup is given as the indices of its selected players so only those variables are referenced in the constraint
+			(players left out of the model can't be selected again and are skipped).
+		"""
+		self.cuts[number] = 'overlap_{}'.format(number)
+		self.prob += (pulp.lpSum(self.lookup[k] for k in lineup if k in self.lookup) <= overlap, self.cuts[number])
+
+	def remove_overlap_cut(self, number):
+		"""
+		Removes the variance constraint for lineup number from the model.
+		"""
+		del self.prob.constraints[self.cuts.pop(number)]
+
+	def objective_coefficients(self):
+		"""
+		Returns the objective coefficients of the player variables.
+		"""
+		return np.array([self.prob.objective.get(variable, 0) for variable in self.variables], dtype=float)
+
+	def set_objective(self, coefficients):
+		"""
+		Replaces the objective with the given coefficients on the player variables.
+		"""
+		self.prob.setObjective(pulp.LpAffineExpression(zip(self.variables, np.asarray(coefficients, dtype=float).tolist())))
+
+	def solve(self, solver):
+		"""
+		Solves the problem and returns the pulp status.
+		"""
+		return self.prob.solve(solver)
+
+	def selected(self):
+		"""
+		Returns the indices of the selected players in the current solution.
+		"""
+		values = np.array([variable.varValue for variable in self.variables], dtype=float)
+		return self.index[np.flatnonzero((values >= 0.9) & (values <= 1.1))]
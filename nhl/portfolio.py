@@ -0,0 +1,155 @@
+import os
+import time
+import signal
+import shutil
+import inspect
+import tempfile
+import multiprocessing
+from multiprocessing.connection import wait
+import pulp
+
+#the backends raced by default (the ones that aren't installed are skipped)
+BACKENDS = ('PULP_CBC_CMD', 'GLPK_CMD', 'CPLEX_PY', 'CPLEX_CMD')
+#extra time a race waits on top of the time limit for the backends to stop and report their incumbents
+GRACE = 5.
+
+def run_backend(name, solver, data, connection):
+	"""
+	Solves a copy of the problem with one backend in a race process and sends the result back over the connection.
+	"""
+	#its own process group, so the solver subprocesses it starts are killed along with it
+	if hasattr(os, 'setpgrp'):
+		os.setpgrp()
+	connection.send(SolverPortfolio.solve_copy(name, solver, data))
+	connection.close()
+
+def stop(process):
+	"""
+	Kills a race process (and its solver subprocesses) if it's still running.
+	"""
+	if process.is_alive():
+		try:
+			os.killpg(process.pid, signal.SIGKILL)
+		#no process groups on this platform, or the process hasn't started its group yet
+		except (AttributeError, OSError):
+			process.kill()
+	process.join()
+
+class SolverPortfolio:
+	"""
+	Races several pulp backends on the same model and keeps the first proven optimal solution.
+	Pass it to Draftkings or Fanduel as the solver. Every backend solves its own copy of the problem concurrently, with the
+		time_limit (in seconds) and the relative gap applied to each solve. The first backend that proves optimality (within
+		the gap) wins. If none proves it within the time limit, the best incumbent any backend found is used.
+	The backends are pulp solver class names; the ones that aren't available locally are skipped.
+	A solve where no backend finds any lineup within the time limit is reported as not solved, which ends generate_lineups
+		like an infeasible model - keep the time limit above the time a backend needs to find a first incumbent.
+	winner is the backend that won the last solve and wins counts the wins of every backend
+		(with metrics set the optimizer also records the winner of every lineup).
+	"""
+	def __init__(self, backends=BACKENDS, time_limit=None, gap=None):
+		self.time_limit = time_limit
+		self.gap = gap
+		self.backends = [name for name in backends if hasattr(pulp, name) and self.backend(name).available()]
+		if not self.backends:
+			raise ValueError('NONE OF THE SOLVER BACKENDS ARE AVAILABLE: {}'.format(', '.join(backends)))
+		self.winner = None
+		self.wins = {name: 0 for name in self.backends}
+
+	def backend(self, name):
+		"""
+		Returns the pulp solver for a backend with the time limit and gap set.
+		"""
+		solver_class = getattr(pulp, name)
+		parameters = inspect.signature(solver_class).parameters
+		settings = {'msg': 0, 'timeLimit': self.time_limit}
+		if self.gap is not None:
+			if 'gapRel' in parameters or any(parameter.kind == parameter.VAR_KEYWORD for parameter in parameters.values()):
+				settings['gapRel'] = self.gap
+			elif name.startswith('GLPK'):
+				settings['options'] = ['--mipgap', str(self.gap)]
+		return solver_class(**settings)
+
+	def settings(self):
+		"""
+		Returns everything that decides the solutions (used in the ResultCache keys).
+		"""
+		return {'backends': self.backends, 'time_limit': self.time_limit, 'gap': self.gap}
+
+	@staticmethod
+	def solve_copy(name, solver, data):
+		"""
+		Solves a copy of the problem (rebuilt from its dict so it has its own variables) with one backend.
+		Returns the backend, the statuses, the objective value, the variable values and the solve time.
+		"""
+		start = time.perf_counter()
+		variables, prob = pulp.LpProblem.fromDict(data)
+		status = prob.solve(solver)
+		values = {key: variable.varValue for key, variable in variables.items()}
+		return {'backend': name, 'status': status, 'sol_status': prob.sol_status, 'objective': pulp.value(prob.objective),
+				'values': values, 'seconds': time.perf_counter() - start}
+
+	def actualSolve(self, prob):
+		"""
+		Races the backends on prob and loads the winning solution into it (the pulp solver interface).
+		Returns the pulp status of the winning solution.
+		"""
+		data = prob.toDict()
+		#the files of the command line backends, removed with the ones the killed backends leave behind
+		directory = tempfile.mkdtemp(prefix='portfolio_')
+		processes = {}
+		for name in self.backends:
+			solver = self.backend(name)
+			if hasattr(solver, 'tmpDir'):
+				solver.tmpDir = directory
+			receiver, sender = multiprocessing.Pipe(duplex=False)
+			process = multiprocessing.Process(target=run_backend, args=(name, solver, data, sender), daemon=True)
+			process.start()
+			sender.close()
+			processes[receiver] = process
+		deadline = time.perf_counter() + self.time_limit + GRACE if self.time_limit is not None else None
+		results = []
+		winner = None
+		try:
+			pending = list(processes)
+			while pending and winner is None:
+				timeout = max(deadline - time.perf_counter(), 0) if deadline is not None else None
+				ready = wait(pending, timeout)
+				if not ready:
+					break
+				for receiver in ready:
+					pending.remove(receiver)
+					try:
+						result = receiver.recv()
+					#the backend's process died without a result
+					except EOFError:
+						continue
+					results.append(result)
+					if result['status'] == pulp.LpStatusOptimal and result['sol_status'] == pulp.LpSolutionOptimal:
+						winner = result
+						break
+		finally:
+			for receiver, process in processes.items():
+				stop(process)
+				receiver.close()
+			shutil.rmtree(directory, ignore_errors=True)
+
+		if winner is None:
+			#the best incumbent, otherwise the status of whichever backend reported first
+			found = [result for result in results if result['sol_status'] in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)]
+			if found:
+				winner = (max if prob.sense == pulp.LpMaximize else min)(found, key=lambda result: result['objective'])
+			elif results:
+				winner = results[0]
+			else:
+				prob.assignStatus(pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound)
+				self.winner = None
+				return prob.status
+		prob.assignVarsVals(winner['values'])
+		prob.assignStatus(winner['status'], winner['sol_status'])
+		self.winner = winner['backend']
+		self.wins[self.winner] += 1
+		return prob.status
+
+	def __repr__(self):
+		return 'SolverPortfolio({})'.format(', '.join('{}={!r}'.format(key, value) for key, value in self.settings().items()))
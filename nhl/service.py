@@ -0,0 +1,254 @@
+"""
+Long running optimizer service that keeps slates warm in memory.
+
+	python -m nhl.service --socket /tmp/nhl_optimizer.sock --workers 4
+	python -m nhl.service --port 8765
+
+Clients connect over the Unix socket (or localhost TCP) and send one JSON request per line. Every response is a JSON line,
+	lineups are streamed back one line per lineup as they're solved:
+	{"op": "load", "slate": "17791", "players": "...player_17791.csv", "goalies": "...goalie_17791.csv"}
+	{"op": "patch", "slate": "17791", "proj": {"Alex Ovechkin": 6.1}, "sal": {"Braden Holtby": 8200}}
+	{"op": "exclude", "slate": "17791", "players": ["Claude Giroux"]}
+	{"op": "lineups", "slate": "17791", "site": "draftkings", "num_lineups": 20, "overlap": 4}
+	{"op": "status"}
+"""
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import pulp
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from nhl.backtest import SITES
+from nhl.lineups import Lineups
+from nhl.slate import SKATERS_SCHEMA, GOALIES_SCHEMA, read_slate_csv
+
+class WarmSlate:
+	"""
+	A parsed slate with the indicators and the type 1 model of every site built once and kept in memory.
+	Both site optimizers share the slate's dataframes, so a patch applies to every site.
+	The models cover the whole player pool (the projections can be patched so nothing is pruned) and the excluded
+		players have their variables fixed to 0.
+	"""
+	def __init__(self, players_filepath, goalies_filepath, solver, slate_cache=None):
+		self.skaters_df = read_slate_csv(players_filepath, SKATERS_SCHEMA, slate_cache)
+		self.goalies_df = read_slate_csv(goalies_filepath, GOALIES_SCHEMA, slate_cache)
+		names = list(self.skaters_df['playerName']) + list(self.goalies_df['playerName'])
+		self.players = {name: i for i, name in enumerate(names)}
+		self.excluded = set()
+		self.optimizers = {}
+		for site, optimizer_class in SITES.items():
+			optimizer = optimizer_class(num_lineups=0, overlap=4, solver=solver, players_filepath=self.skaters_df,
+										goalies_filepath=self.goalies_df, output_filepath=None)
+			optimizer.create_indicators()
+			optimizer.model = optimizer.build_type_1(pruned=False)
+			self.optimizers[site] = optimizer
+		#one request at a time per site model (created by the service on its event loop)
+		self.locks = {}
+
+	def indices(self, names):
+		"""
+		Returns the player indices of the names, raises a ValueError for unknown players.
+		"""
+		unknown = [name for name in names if name not in self.players]
+		if unknown:
+			raise ValueError('UNKNOWN PLAYERS: {}'.format(', '.join(unknown)))
+		return [self.players[name] for name in names]
+
+	def patch(self, proj=None, sal=None):
+		"""
+		Updates the projections and salaries ({name: value}) of the slate.
+		The projections only replace the objective of the built models, a salary change rebuilds them on the next request.
+		Raises a ValueError for unknown players or invalid values without changing anything.
+		"""
+		#every name and value is checked before anything is changed, so an invalid patch leaves the slate as it was
+		patches = []
+		for column, values in (('proj', proj), ('sal', sal)):
+			if not values:
+				continue
+			indices = np.array(self.indices(list(values)))
+			new_values = np.array(list(values.values()), dtype=float)
+			if column == 'sal':
+				new_values = np.round(new_values)
+			patches.append((column, indices, new_values))
+		for column, indices, new_values in patches:
+			skaters = indices < len(self.skaters_df.index)
+			for data, rows, patched in ((self.skaters_df, indices[skaters], new_values[skaters]),
+										(self.goalies_df, indices[~skaters] - len(self.skaters_df.index), new_values[~skaters])):
+				if len(rows):
+					data_values = data[column].values.copy()
+					data_values[rows] = patched
+					data[column] = data_values
+		for optimizer in self.optimizers.values():
+			if sal:
+				optimizer.model = None
+			elif proj and optimizer.model is not None:
+				all_proj = np.concatenate((self.skaters_df['proj'].values, self.goalies_df['proj'].values))
+				optimizer.model.set_objective(all_proj[optimizer.model.index])
+
+	def prepare(self, site, overlap):
+		"""
+		Readies a site's model for a new request: rebuilds it if needed, drops the previous request's overlap cuts
+			and fixes the excluded players to 0.
+		"""
+		optimizer = self.optimizers[site]
+		if optimizer.model is None:
+			optimizer.model = optimizer.build_type_1(pruned=False)
+		model = optimizer.model
+		for number in list(model.cuts):
+			model.remove_overlap_cut(number)
+		model.num_seen = 0
+		for k, variable in model.lookup.items():
+			variable.upBound = 0 if k in self.excluded else 1
+		optimizer.overlap = overlap
+		optimizer.lazy_cuts = False
+		return optimizer
+
+
+class OptimizerService:
+	"""
+	Serves the requests of every client connection over a bounded pool of solver threads (the solvers run as
+		subprocesses or native libraries, so the threads solve concurrently and the event loop is never blocked).
+	Requests for the same slate and site are queued on that site's model, the others run side by side up to workers.
+	"""
+	def __init__(self, solver=None, workers=4, slate_cache=None):
+		self.solver = solver or pulp.PULP_CBC_CMD(msg=0)
+		self.slate_cache = slate_cache
+		self.executor = ThreadPoolExecutor(workers)
+		self.slates = {}
+
+	async def run_in_pool(self, function, *args):
+		return await asyncio.get_event_loop().run_in_executor(self.executor, function, *args)
+
+	def slate(self, request):
+		if request.get('slate') not in self.slates:
+			raise ValueError('SLATE NOT LOADED: {}'.format(request.get('slate')))
+		return self.slates[request['slate']]
+
+	async def handle(self, reader, writer):
+		"""
+		Answers the requests of one connection until the client disconnects.
+		"""
+		async def send(message):
+			writer.write(json.dumps(message, default=float).encode() + b'\n')
+			await writer.drain()
+
+		while True:
+			line = await reader.readline()
+			if not line:
+				break
+			try:
+				request = json.loads(line.decode())
+				op = request.get('op')
+				if op not in ('load', 'patch', 'exclude', 'lineups', 'status'):
+					raise ValueError('UNKNOWN OP: {}'.format(op))
+				await getattr(self, op)(request, send)
+			except Exception as error:
+				await send({'error': '{}: {}'.format(type(error).__name__, error)})
+		writer.close()
+
+	async def load(self, request, send):
+		start = time.perf_counter()
+		slate = await self.run_in_pool(WarmSlate, request['players'], request['goalies'], self.solver, self.slate_cache)
+		slate.locks = {site: asyncio.Lock() for site in SITES}
+		self.slates[request['slate']] = slate
+		await send({'ok': True, 'slate': request['slate'], 'skaters': len(slate.skaters_df.index),
+					'goalies': len(slate.goalies_df.index), 'seconds': time.perf_counter() - start})
+
+	async def patch(self, request, send):
+		slate = self.slate(request)
+		#wait for the running requests on the slate's models
+		for lock in slate.locks.values():
+			await lock.acquire()
+		try:
+			slate.patch(request.get('proj'), request.get('sal'))
+		finally:
+			for lock in slate.locks.values():
+				lock.release()
+		await send({'ok': True, 'slate': request['slate']})
+
+	async def exclude(self, request, send):
+		"""
+		Replaces the excluded players of the slate (an empty list brings every player back).
+		"""
+		slate = self.slate(request)
+		slate.excluded = set(slate.indices(request.get('players', [])))
+		await send({'ok': True, 'slate': request['slate'], 'excluded': len(slate.excluded)})
+
+	async def lineups(self, request, send):
+		"""
+		Solves num_lineups lineups for the site with the overlap cuts between them and streams each one back as it's solved.
+		"""
+		start = time.perf_counter()
+		slate = self.slate(request)
+		site = request.get('site', 'draftkings')
+		if site not in SITES:
+			raise ValueError('UNKNOWN SITE: {}'.format(site))
+		async with slate.locks[site]:
+			optimizer = await self.run_in_pool(slate.prepare, site, request.get('overlap', 4))
+			lineups = Lineups(optimizer.num_skaters + optimizer.num_goalies, optimizer.roster_skaters + optimizer.roster_goalies)
+			for number in range(request.get('num_lineups', 1)):
+				lineup = await self.run_in_pool(optimizer.solve_model, lineups)
+				if lineup is None:
+					break
+				lineups.append(lineup)
+				filled_lineup = optimizer.fill_lineups(np.atleast_2d(lineup))
+				await send({'lineup': number + 1, 'players': filled_lineup.iloc[0, :len(optimizer.header)].tolist(),
+							'header': optimizer.header, 'proj': filled_lineup['PROJ'].values[0],
+							'seconds': time.perf_counter() - start})
+		await send({'done': True, 'lineups': len(lineups), 'seconds': time.perf_counter() - start})
+
+	async def status(self, request, send):
+		await send({'slates': {name: {'skaters': len(slate.skaters_df.index), 'goalies': len(slate.goalies_df.index),
+									'excluded': len(slate.excluded)} for name, slate in self.slates.items()}})
+
+	async def serve(self, socket_path=None, port=None):
+		"""
+		Serves on the Unix socket at socket_path, or on localhost:port, until cancelled.
+		"""
+		if socket_path is not None:
+			server = await asyncio.start_unix_server(self.handle, path=socket_path)
+			print('Serving on {}'.format(socket_path))
+		else:
+			server = await asyncio.start_server(self.handle, host='127.0.0.1', port=port)
+			print('Serving on 127.0.0.1:{}'.format(port))
+		async with server:
+			await server.serve_forever()
+
+
+def request(message, socket_path=None, port=None):
+	"""
+	Sends one request to a running service and yields its responses (a blocking client for scripts).
+	"""
+	if socket_path is not None:
+		connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		connection.connect(socket_path)
+	else:
+		connection = socket.create_connection(('127.0.0.1', port))
+	with connection, connection.makefile('rwb') as stream:
+		stream.write(json.dumps(message).encode() + b'\n')
+		stream.flush()
+		for line in stream:
+			response = json.loads(line.decode())
+			yield response
+			if message.get('op') != 'lineups' or 'done' in response or 'error' in response:
+				break
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Serve the NHL optimizer with warm slates over a local socket.')
+	parser.add_argument('--socket', help='path of the Unix socket to serve on')
+	parser.add_argument('--port', type=int, default=8765, help='localhost port to serve on when no socket is given')
+	parser.add_argument('--workers', type=int, default=4, help='maximum number of concurrent solves')
+	parser.add_argument('--solver', default='PULP_CBC_CMD', help='name of the pulp solver class')
+	parser.add_argument('--slate-cache', default=None, help='directory of the binary slate cache')
+	args = parser.parse_args(argv)
+	service = OptimizerService(getattr(pulp, args.solver)(msg=0), args.workers, args.slate_cache)
+	try:
+		asyncio.run(service.serve(args.socket, args.port))
+	except KeyboardInterrupt:
+		pass
+
+if __name__ == '__main__':
+	main(sys.argv[1:])
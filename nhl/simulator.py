@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+class Simulator:
+	"""
+	Monte Carlo simulator for the player projections.
+	Every simulation draws one correlated outcome for all of the skaters and goalies (skaters first, then goalies)
+		from a factor model built on the team, line, ppLine and opp columns:
+		- skaters load on a team factor, a (team, line) factor and a (team, ppLine) factor
+		- goalies load on their own team factor and negatively on their opponent's team factor
+	The rest of each player's variance is independent and the standard deviation is cv times the projection.
+	"""
+	def __init__(self, skaters_df, goalies_df, seed=None, cv=0.8, team_weight=0.35, line_weight=0.45, pp_weight=0.3,
+					goalie_team_weight=0.2, goalie_opp_weight=0.5):
+		self.seed = np.random.randint(2**31 - 1) if seed is None else seed
+		self.num_skaters = len(skaters_df.index)
+		self.num_goalies = len(goalies_df.index)
+		self.proj = np.concatenate((skaters_df['proj'].values, goalies_df['proj'].values)).astype(np.float32)
+		self.sd = cv*np.abs(self.proj)
+
+		teams = pd.Categorical(np.concatenate((skaters_df['team'].values, skaters_df['opp'].values,
+												goalies_df['team'].values, goalies_df['opp'].values)).astype(str))
+		skaters_team = teams.codes[:self.num_skaters].astype(int)
+		goalies_team = teams.codes[2*self.num_skaters:2*self.num_skaters + self.num_goalies]
+		goalies_opp = teams.codes[2*self.num_skaters + self.num_goalies:]
+		num_teams = len(teams.categories)
+		_, lines = np.unique(skaters_team*1000 + skaters_df['line'].values.astype(int), return_inverse=True)
+		pp_lines = skaters_df['ppLine'].fillna(0).values.astype(int) if 'ppLine' in skaters_df else np.zeros(self.num_skaters, dtype=int)
+		on_pp = pp_lines > 0
+		_, power_plays = np.unique(skaters_team[on_pp]*1000 + pp_lines[on_pp], return_inverse=True)
+
+		#factor loadings (players x factors): teams, then lines, then power play units
+		skaters = np.arange(self.num_skaters)
+		goalies = self.num_skaters + np.arange(self.num_goalies)
+		line_offset = num_teams
+		pp_offset = line_offset + (lines.max() + 1 if len(lines) else 0)
+		num_factors = pp_offset + (power_plays.max() + 1 if len(power_plays) else 0)
+		rows = np.concatenate((skaters, skaters, skaters[on_pp], goalies, goalies))
+		cols = np.concatenate((skaters_team, line_offset + lines, pp_offset + power_plays, goalies_team, goalies_opp))
+		data = np.concatenate((np.full(self.num_skaters, team_weight), np.full(self.num_skaters, line_weight),
+								np.full(on_pp.sum(), pp_weight), np.full(self.num_goalies, goalie_team_weight),
+								np.full(self.num_goalies, -goalie_opp_weight)))
+		self.loadings = sp.csr_matrix((data, (rows, cols)), shape=(self.num_skaters + self.num_goalies, num_factors))
+		#the independent part tops every player up to unit variance
+		self.idiosyncratic = np.sqrt(np.clip(1 - np.asarray(self.loadings.multiply(self.loadings).sum(axis=1)).ravel(), 0, 1)).astype(np.float32)
+
+	def draw(self, num_sims, block=0):
+		"""
+		Returns num_sims simulated outcomes (sims x players) in one batch.
+		The block number seeds the batch so any block can be drawn again.
+		"""
+		random = np.random.RandomState([self.seed, block])
+		factors = random.standard_normal((num_sims, self.loadings.shape[1])).astype(np.float32)
+		noise = random.standard_normal((num_sims, len(self.proj))).astype(np.float32)
+		shocks = np.asarray(self.loadings.dot(factors.T).T, dtype=np.float32) + noise*self.idiosyncratic
+		return self.proj + self.sd*shocks
+
+	@staticmethod
+	def boundaries(num_sims, num_blocks):
+		"""
+		Returns the num_blocks + 1 boundaries that split num_sims into num_blocks blocks of (nearly) equal size.
+		"""
+		if num_sims < num_blocks:
+			raise ValueError('num_sims ({}) must be at least the number of blocks ({})'.format(num_sims, num_blocks))
+		return np.linspace(0, num_sims, num_blocks + 1).astype(int)
+
+	def blocks(self, boundaries):
+		"""
+		Streams the simulations block by block (between consecutive boundaries) so memory stays bounded.
+		"""
+		for block, (start, end) in enumerate(zip(boundaries[:-1], boundaries[1:])):
+			yield self.draw(end - start, block)
+
+	def score(self, lineups, boundaries):
+		"""
+		Returns the simulated score of every lineup (lineups x sims) by streaming the same blocks again.
+		"""
+		scores = np.zeros((len(lineups), boundaries[-1]), dtype=np.float32)
+		indices = lineups[:]
+		for draws, start in zip(self.blocks(boundaries), boundaries):
+			scores[:, start:start + len(draws)] = draws[:, indices].sum(axis=2).T
+		return scores
@@ -0,0 +1,123 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+#column types of the inputs - (column, type, required), the categorical columns are kept as codes
+SKATERS_SCHEMA = [('playerName', 'str', True), ('sal', 'int32', True), ('pos', 'category', True), ('team', 'category', True),
+					('opp', 'category', True), ('line', 'int8', True), ('ppLine', 'int8', False), ('proj', 'float64', True),
+					('actual', 'float64', False)]
+GOALIES_SCHEMA = [('playerName', 'str', True), ('sal', 'int32', True), ('team', 'category', True), ('opp', 'category', True),
+					('proj', 'float64', True), ('actual', 'float64', False)]
+#columns where a missing value means 0
+FILL_ZERO = ('ppLine',)
+
+def apply_schema(data, schema, filepath):
+	"""
+	Returns the data with the schema's column types (any other columns are kept as they are).
+	Raises a ValueError listing every missing required column and every column with missing or invalid values.
+	"""
+	missing = [column for column, _, required in schema if required and column not in data]
+	if missing:
+		raise ValueError('MISSING COLUMNS IN {}: {}'.format(filepath, ', '.join(missing)))
+	data = data.copy()
+	errors = []
+	for column, kind, required in schema:
+		if column not in data:
+			continue
+		values = data[column]
+		if kind in ('str', 'category'):
+			invalid = values.isnull() & required
+			values = values.astype(str).str.strip()
+			data[column] = values.astype('category') if kind == 'category' else values.astype(object)
+		else:
+			#missing values are only allowed in the optional columns (as NaN) or where they mean 0
+			numbers = pd.to_numeric(values, errors='coerce')
+			if column in FILL_ZERO:
+				numbers = numbers.where(values.notnull(), 0)
+			invalid = numbers.isnull() & (values.notnull() | required)
+			if kind != 'float64':
+				invalid |= numbers.notnull() & (numbers != numbers.round())
+				invalid |= numbers.isnull()
+			if not invalid.any():
+				data[column] = numbers.astype(kind)
+		if invalid.any():
+			rows = (np.flatnonzero(invalid.values) + 2).tolist()
+			errors.append('{} (lines {})'.format(column, ', '.join(str(row) for row in rows[:5]) + (', ...' if len(rows) > 5 else '')))
+	if errors:
+		raise ValueError('INVALID VALUES IN {}: {}'.format(filepath, '; '.join(errors)))
+	return data
+
+def cache_key(filepath, schema):
+	"""
+	Returns the content address of a parsed input (the file's bytes and the schema).
+	"""
+	digest = hashlib.sha256(repr(schema).encode())
+	with open(filepath, 'rb') as f:
+		for chunk in iter(lambda: f.read(1 << 20), b''):
+			digest.update(chunk)
+	return digest.hexdigest()
+
+def save_binary(data, directory):
+	"""
+	Saves a parsed input as one .npy file per column (codes for the categorical columns) plus a meta.json with the
+		column order and the categories. The directory is written next to its final name and renamed into place.
+	"""
+	partial = directory + '.partial.{}'.format(os.getpid())
+	os.makedirs(partial, exist_ok=True)
+	columns = []
+	for i, column in enumerate(data.columns):
+		values = data[column]
+		if values.dtype.name == 'category':
+			columns.append({'name': column, 'kind': 'category', 'categories': values.cat.categories.astype(str).tolist()})
+			array = values.cat.codes.values
+		elif values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+			columns.append({'name': column, 'kind': 'str'})
+			array = np.array(values.astype(str).tolist(), dtype=str)
+		else:
+			columns.append({'name': column, 'kind': str(values.dtype)})
+			array = values.values
+		np.save(os.path.join(partial, '{}.npy'.format(i)), np.ascontiguousarray(array))
+	with open(os.path.join(partial, 'meta.json'), 'w') as f:
+		json.dump({'rows': len(data.index), 'columns': columns}, f)
+	try:
+		os.rename(partial, directory)
+	#another process cached the same input first
+	except OSError:
+		for name in os.listdir(partial):
+			os.remove(os.path.join(partial, name))
+		os.rmdir(partial)
+
+def load_binary(directory):
+	"""
+	Returns the parsed input saved by save_binary, with every column memory-mapped from its .npy file.
+	"""
+	with open(os.path.join(directory, 'meta.json')) as f:
+		meta = json.load(f)
+	data = {}
+	for i, column in enumerate(meta['columns']):
+		array = np.load(os.path.join(directory, '{}.npy'.format(i)), mmap_mode='r')
+		if column['kind'] == 'category':
+			data[column['name']] = pd.Categorical.from_codes(array, column['categories'])
+		elif column['kind'] == 'str':
+			data[column['name']] = pd.Series(array.astype(object), dtype=object)
+		else:
+			data[column['name']] = array
+	return pd.DataFrame(data, columns=[column['name'] for column in meta['columns']])
+
+def read_slate_csv(filepath, schema, cache_directory=None):
+	"""
+	Returns the typed and validated input at filepath (see apply_schema).
+	With a cache_directory the parsed input is saved there in a binary columnar format keyed by the file's contents
+		and memory-mapped on the next load instead of parsing the CSV again.
+	"""
+	if cache_directory is not None:
+		directory = os.path.join(cache_directory, cache_key(filepath, schema))
+		if os.path.exists(os.path.join(directory, 'meta.json')):
+			return load_binary(directory)
+	data = apply_schema(pd.read_csv(filepath), schema, filepath)
+	if cache_directory is not None:
+		os.makedirs(cache_directory, exist_ok=True)
+		save_binary(data, directory)
+	return data
@@ -0,0 +1,51 @@
+import csv
+import time
+import numpy as np
+
+class LineupWriter:
+	"""
+	Streams the lineups of an optimizer to its upload file (output_filepath) and its projections file (_proj.csv) in one pass.
+	Pass it to generate_lineups as writer=... and every lineup is filled and written to both files as soon as it's produced,
+		so nothing is buffered and the files can be read while the lineups are still being generated.
+	"""
+	def __init__(self, optimizer):
+		self.optimizer = optimizer
+		self.count = 0
+		self.seconds = 0.
+		self.upload_file = open(optimizer.output_filepath, 'w')
+		self.projection_file = open(optimizer.projection_filepath(), 'w')
+		self.upload = csv.writer(self.upload_file)
+		self.projection = csv.writer(self.projection_file)
+		self.upload.writerow(optimizer.header)
+		self.projection.writerow(list(optimizer.header) + ['PROJ'] + (['ACTUAL'] if optimizer.actuals else []))
+
+	def write(self, lineups):
+		"""
+		Fills and writes a lineup (or a 2-D array of lineups) as player indices.
+		"""
+		start = time.perf_counter()
+		lineups = np.atleast_2d(lineups)
+		if len(lineups):
+			rows = self.optimizer.fill_lineups(lineups).values.tolist()
+			self.upload.writerows(row[:len(self.optimizer.header)] for row in rows)
+			self.projection.writerows(rows)
+			self.upload_file.flush()
+			self.projection_file.flush()
+			self.count += len(rows)
+		self.seconds += time.perf_counter() - start
+
+	def close(self):
+		if self.upload_file.closed:
+			return
+		self.upload_file.close()
+		self.projection_file.close()
+		print("Saved lineups for upload to: {}".format(self.optimizer.output_filepath))
+		print("Saved lineups with projection to: {}".format(self.optimizer.projection_filepath()))
+		if self.optimizer.metrics is not None:
+			self.optimizer.metrics.record('save_file', seconds=self.seconds, show_proj=None, lineups=self.count)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
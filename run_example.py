@@ -1,6 +1,7 @@
 import pulp
 from nhl.fanduel import Fanduel as NHLFanduel
 from nhl.draftkings import Draftkings as NHLDraftkings
+from nhl.writer import LineupWriter
 
 """EXAMPLE SHOWING HOW TO RUN THE NHL OPTIMIZER"""
 while True:
@@ -29,11 +30,8 @@ while True:
 	#create the indicators used to set the constraints to be used by the formula
 	optimizer.create_indicators()
 	#generate the lineups with the formula and the indicators
-	lineups = optimizer.generate_lineups(formula=optimizer.type_1)
-	#fill the lineups with player names - send in the positions indicator
-	filled_lineups = optimizer.fill_lineups(lineups)
-	#save the lineups
-	optimizer.save_file(optimizer.header, filled_lineups)
-	optimizer.save_file(optimizer.header, filled_lineups, show_proj=True)
+	#the writer fills each lineup with player names and saves it to the upload and projection files as it's produced
+	with LineupWriter(optimizer) as writer:
+		lineups = optimizer.generate_lineups(formula=optimizer.type_1, writer=writer)
 	break
 